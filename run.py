@@ -2,15 +2,21 @@
 Simple entry point for Azure App Service.
 """
 import os
+import sys
 import uvicorn
 
 if __name__ == "__main__":
-    # Get port from environment (Azure uses WEBSITES_PORT)
-    port = int(os.environ.get("WEBSITES_PORT", 8000))
+    # Get port from environment (Azure uses WEBSITES_PORT, other hosts PORT)
+    port = int(os.environ.get("WEBSITES_PORT") or os.environ.get("PORT") or 8000)
 
     uvicorn.run(
         "src.api_server.main:app",
         host="0.0.0.0",
         port=port,
+        workers=int(os.environ.get("UVICORN_WORKERS", 1)),
+        # C event loop and HTTP parser (both ship with uvicorn[standard]);
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -13,10 +13,9 @@ import os
 from typing import Dict, Any, Optional
 
 from apify import Actor
-from anthropic import Anthropic
 
 from .api_client import NewsAPIClient
-from .intent.news_agent import NewsAgent
+from .intent.news_agent import NewsAgent, current_turn, parse_tool_result
 from .config import setup_logging
 
 
@@ -59,9 +58,12 @@ async def main() -> None:
             await Actor.fail('Missing NEWS_API_KEY. Please provide it in input or environment.')
             return
 
+        news_client = None
         try:
             # Initialize clients
             Actor.log.info('Initializing AI clients...')
+            # Imported here so early input validation failures skip loading the SDK
+            from anthropic import Anthropic
             anthropic_client = Anthropic(api_key=anthropic_key)
             news_client = NewsAPIClient(api_key=news_api_key)
 
@@ -69,16 +71,18 @@ async def main() -> None:
             news_agent = NewsAgent(anthropic_client, news_client)
             Actor.log.info('NewsAgent initialized')
 
-            # Process the query
+            # Process the query off the event loop so the Actor stays responsive
+            # while the agent fans out NewsAPI requests
             Actor.log.info(f'Processing query: {query[:100]}...')
-            result = news_agent.process_request(
+            result = await asyncio.to_thread(
+                news_agent.process_request,
                 user_prompt=query,
                 session_id="actor-session"  # Single session for Actor runs
             )
 
             # Extract results
             natural_response = result.get("response", "")
-            articles_data = _extract_articles_from_messages(result.get("messages", []))
+            articles_data = _extract_articles_from_messages(result.get("messages", []), max_results)
 
             # Build output based on format
             output = {
@@ -90,7 +94,7 @@ async def main() -> None:
                 output["response"] = natural_response
 
             if response_format in ["structured", "both"] and articles_data:
-                output["articles"] = articles_data["articles"][:max_results]
+                output["articles"] = articles_data["articles"]
                 output["total_results"] = articles_data.get("total_results", 0)
 
             # Save to default dataset
@@ -109,24 +113,28 @@ async def main() -> None:
                 news_client.close()
 
 
-def _extract_articles_from_messages(messages: list) -> Optional[Dict[str, Any]]:
+def _extract_articles_from_messages(messages: list, max_results: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
     Extract article data from conversation messages.
 
-    Looks for tool results in the conversation that contain article data.
+    Looks for tool results from the latest request that contain article data.
+    Stops as soon as max_results articles have been collected.
 
     Args:
         messages: List of conversation messages
+        max_results: Maximum number of articles to collect (no limit if None)
 
     Returns:
         Dictionary with articles and total_results, or None if no articles found
     """
-    import json
-
     articles = []
     total_results = 0
+    limit_reached = False
+
+    for message in current_turn(messages):
+        if limit_reached:
+            break
 
-    for message in messages:
         if message.get("role") != "user":
             continue
 
@@ -138,22 +146,30 @@ def _extract_articles_from_messages(messages: list) -> Optional[Dict[str, Any]]:
             if not isinstance(item, dict) or item.get("type") != "tool_result":
                 continue
 
+            # Skip payloads that cannot contain articles without parsing them
+            tool_content = item.get("content", "")
+            if isinstance(tool_content, str) and '"articles"' not in tool_content:
+                continue
+
             # Parse the tool result content
             try:
-                tool_content = item.get("content", "")
-                if isinstance(tool_content, str):
-                    tool_data = json.loads(tool_content)
-                else:
-                    tool_data = tool_content
+                tool_data = parse_tool_result(tool_content)
 
                 # Check if this result contains articles
                 if "articles" in tool_data:
-                    articles.extend(tool_data["articles"])
+                    if max_results is None:
+                        articles.extend(tool_data["articles"])
+                    else:
+                        articles.extend(tool_data["articles"][:max_results - len(articles)])
                     total_results = max(total_results, tool_data.get("total_results", 0))
 
-            except (json.JSONDecodeError, Exception):
+            except Exception:
                 continue
 
+            if max_results is not None and len(articles) >= max_results:
+                limit_reached = True
+                break
+
     if articles:
         return {
             "articles": articles,
@@ -17,8 +17,22 @@ from .models import (
     SourcesQuery
 )
 
-# Query optimization (deprecated - not needed with MCP)
-from .query_optimizer import QueryOptimizer
+# Query optimization (deprecated - not needed with MCP) and the optional
+# embedding-based prompt cache are loaded on first access (PEP 562), so
+# importing the package does not pull in their dependencies
+_LAZY_IMPORTS = {
+    'QueryOptimizer': '.query_optimizer',
+    'SemanticCache': '.semantic_cache',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     # Direct API clients
@@ -31,5 +45,7 @@ __all__ = [
     'TopHeadlinesQuery',
     'SourcesQuery',
     # Optimization (deprecated)
-    'QueryOptimizer'
+    'QueryOptimizer',
+    # Caching
+    'SemanticCache'
 ]
@@ -1,17 +1,38 @@
 """
 Data models for news articles
 """
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Iterator, Union
-from enum import Enum
-import hashlib
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, Union
+from functools import lru_cache
 import logging
-import validators
 import itertools
 
+try:
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:
+    def _parse_iso_datetime(value: str) -> datetime:
+        # fromisoformat() only accepts a trailing 'Z' from Python 3.11 onwards
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.fromisoformat(value)
+
 logger = logging.getLogger(__name__)
 
+# Allowed values for NewsAPI parameters
+VALID_SEARCH_IN = frozenset({'title', 'description', 'content'})
+
+VALID_LANGUAGES = frozenset({'ar', 'de', 'en', 'es', 'fr', 'he', 'it', 'nl', 'no', 'pt', 'ru', 'sv', 'ud', 'zh'})
+
+VALID_COUNTRIES = frozenset({
+    'ae', 'ar', 'at', 'au', 'be', 'bg', 'br', 'ca', 'ch', 'cn', 'co', 'cu', 'cz', 'de',
+    'eg', 'fr', 'gb', 'gr', 'hk', 'hu', 'id', 'ie', 'il', 'in', 'it', 'jp', 'kr', 'lt',
+    'lv', 'ma', 'mx', 'my', 'ng', 'nl', 'no', 'nz', 'ph', 'pl', 'pt', 'ro', 'rs', 'ru',
+    'sa', 'se', 'sg', 'si', 'sk', 'th', 'tr', 'tw', 'ua', 'us', 've', 'za'
+})
+
+VALID_CATEGORIES = frozenset({'business', 'entertainment', 'general', 'health', 'science', 'sports', 'technology'})
+
 
 # Validation Functions
 def validate_query_string(q: str) -> str:
@@ -29,31 +50,49 @@ def validate_query_string(q: str) -> str:
         return q[:500]
     return q
 
+def _partition(values: Iterable[str], allowed: frozenset) -> Tuple[List[str], List[str]]:
+    """Split values into (allowed values lowercased, rejected values as given)."""
+    valid, invalid = [], []
+    for value in values:
+        value_lower = value.lower()
+        if value_lower in allowed:
+            valid.append(value_lower)
+        else:
+            invalid.append(value)
+    return valid, invalid
+
 def validate_searchIn(searchIn: Optional[List[str]]) -> Optional[List[str]]:
     if not searchIn:
         return None
 
-    valid_fields = ['title','description','content']
-    
-    invalid_searchIns = [field for field in searchIn if field.lower() not in valid_fields]
-    valid_searchIns = [field.lower() for field in searchIn if field.lower() in valid_fields]
-    
+    valid_searchIns, invalid_searchIns = _partition(searchIn, VALID_SEARCH_IN)
+
     if invalid_searchIns:
-        logger.warning(f"Invalid searchIn fields removed: {invalid_searchIns}. Allowed fields: {valid_fields}")
+        logger.warning(f"Invalid searchIn fields removed: {invalid_searchIns}. Allowed fields: {sorted(VALID_SEARCH_IN)}")
 
     if not valid_searchIns:
         logger.warning("No valid searchIn fields provided. Default is All")
         return None
-    if set(valid_searchIns) == set(valid_fields):
+    if len(set(valid_searchIns)) == len(VALID_SEARCH_IN):
         return None
     return valid_searchIns
 
+@lru_cache(maxsize=4096)
+def _is_domain(domain: str) -> bool:
+    """Memoized domain check; the same outlets recur across queries."""
+    import validators  # Deferred: only needed when domains are supplied
+    return bool(validators.domain(domain))
+
 def validate_domains(domains: List[str]) -> List[str]:
     if not domains:
         return None
 
-    invalid_domains = [domain for domain in domains if not validators.domain(domain)]
-    valid_domains = [domain for domain in domains if validators.domain(domain)]
+    valid_domains, invalid_domains = [], []
+    for domain in domains:
+        if _is_domain(domain):
+            valid_domains.append(domain)
+        else:
+            invalid_domains.append(domain)
 
     if invalid_domains:
         logger.warning(f"Invalid domains removed: {invalid_domains}")
@@ -87,10 +126,7 @@ def validate_language_codes(language_codes: Optional[List[str]]) -> Optional[Lis
     if not language_codes:
         return None
 
-    allowed_langs = ['ar','de','en','es','fr','he','it','nl','no','pt','ru','sv','ud','zh']
-
-    invalid_langs = [lang for lang in language_codes if lang.lower() not in allowed_langs]
-    valid_langs = [lang.lower() for lang in language_codes if lang.lower() in allowed_langs]
+    valid_langs, invalid_langs = _partition(language_codes, VALID_LANGUAGES)
 
     if invalid_langs:
         logger.warning(f"Invalid ISO-639-1 language codes removed: {invalid_langs}")
@@ -99,7 +135,7 @@ def validate_language_codes(language_codes: Optional[List[str]]) -> Optional[Lis
         logger.warning("All language codes were invalid, setting to Default:All")
         return None
 
-    if set(valid_langs) == set(allowed_langs):
+    if len(set(valid_langs)) == len(VALID_LANGUAGES):
         return None
     return valid_langs
 
@@ -117,16 +153,7 @@ def validate_country_code(country_codes: Optional[List[str]]) -> Optional[List[s
     if not country_codes:
         return None
 
-    # Valid country codes for NewsAPI
-    valid_countries = [
-        'ae', 'ar', 'at', 'au', 'be', 'bg', 'br', 'ca', 'ch', 'cn', 'co', 'cu', 'cz', 'de',
-        'eg', 'fr', 'gb', 'gr', 'hk', 'hu', 'id', 'ie', 'il', 'in', 'it', 'jp', 'kr', 'lt',
-        'lv', 'ma', 'mx', 'my', 'ng', 'nl', 'no', 'nz', 'ph', 'pl', 'pt', 'ro', 'rs', 'ru',
-        'sa', 'se', 'sg', 'si', 'sk', 'th', 'tr', 'tw', 'ua', 'us', 've', 'za'
-    ]
-
-    invalid_codes = [code for code in country_codes if code.lower() not in valid_countries]
-    valid_codes = [code.lower() for code in country_codes if code.lower() in valid_countries]
+    valid_codes, invalid_codes = _partition(country_codes, VALID_COUNTRIES)
 
     if invalid_codes:
         logger.warning(f"Invalid country codes removed: {invalid_codes}. Must be ISO 3166-1 alpha-2 codes.")
@@ -135,7 +162,7 @@ def validate_country_code(country_codes: Optional[List[str]]) -> Optional[List[s
         logger.warning("All country codes were invalid, setting to Default = All")
         return None
 
-    if set(valid_codes) == set(valid_countries):
+    if len(set(valid_codes)) == len(VALID_COUNTRIES):
         return None
 
     return valid_codes
@@ -153,19 +180,16 @@ def validate_categories(categories: Optional[List[str]]) -> Optional[List[str]]:
     if not categories:
         return None
 
-    valid_categories = ['business', 'entertainment', 'general', 'health', 'science', 'sports', 'technology']
+    valid_cats, invalid_cats = _partition(categories, VALID_CATEGORIES)
 
-    invalid_cats = [cat for cat in categories if cat.lower() not in valid_categories]
-    valid_cats = [cat.lower() for cat in categories if cat.lower() in valid_categories]
-    
     if invalid_cats:
-        logger.warning(f"Invalid categories removed: {invalid_cats}. Allowed categories: {valid_categories}")
+        logger.warning(f"Invalid categories removed: {invalid_cats}. Allowed categories: {sorted(VALID_CATEGORIES)}")
 
     if not valid_cats:
         logger.warning("All categories were invalid. Default is All")
         return None
 
-    if set(valid_cats) == set(valid_categories):
+    if len(set(valid_cats)) == len(VALID_CATEGORIES):
         return None
 
     return valid_cats
@@ -175,11 +199,18 @@ def validate_categories(categories: Optional[List[str]]) -> Optional[List[str]]:
 # These classes are strict 1-to-1 mappings with NewsAPI endpoints
 # ============================================================================
 
-@dataclass
+def _format_date(value: datetime) -> str:
+    """Format as YYYY-MM-DD without going through strftime's locale handling."""
+    return f"{value.year:04d}-{value.month:02d}-{value.day:02d}"
+
+@dataclass(slots=True)
 class EverythingQuery:
     """
     API-compliant query for NewsAPI /everything endpoint.
     All parameters strictly follow NewsAPI constraints.
+
+    Request parameters are built once at construction; only `page` may
+    change afterwards (it is updated while paginating).
     """
     q: str  # Required: search query (max 500 chars)
     searchIn: Optional[List[str]] = None  # title, description, content
@@ -192,12 +223,11 @@ class EverythingQuery:
     sortBy: Optional[str] = None  # relevancy, popularity, publishedAt
     pageSize: Optional[int] = None  # Max 100
     page: Optional[int] = None
+    _params: Dict[str, Any] = field(default=None, init=False, repr=False, compare=False)
 
-    def to_api_params(self) -> Dict[str, Any]:
-        """Convert to NewsAPI query parameters."""
+    def __post_init__(self):
         params: Dict[str, Any] = {
             'q': self.q,
-            'page': self.page if self.page else 1,
             'pageSize': min(self.pageSize, 100) if self.pageSize else 100
         }
 
@@ -214,10 +244,10 @@ class EverythingQuery:
             params['excludeDomains'] = ','.join(self.excludeDomains)
 
         if self.from_date:
-            params['from'] = self.from_date.strftime('%Y-%m-%d')
+            params['from'] = _format_date(self.from_date)
 
         if self.to_date:
-            params['to'] = self.to_date.strftime('%Y-%m-%d')
+            params['to'] = _format_date(self.to_date)
 
         if self.language:
             params['language'] = self.language
@@ -225,13 +255,22 @@ class EverythingQuery:
         if self.sortBy:
             params['sortBy'] = self.sortBy
 
+        self._params = params
+
+    def to_api_params(self) -> Dict[str, Any]:
+        """Convert to NewsAPI query parameters."""
+        params = dict(self._params)
+        params['page'] = self.page if self.page else 1
         return params
 
-@dataclass
+@dataclass(slots=True)
 class TopHeadlinesQuery:
     """
     API-compliant query for NewsAPI /top-headlines endpoint.
     All parameters strictly follow NewsAPI constraints.
+
+    Request parameters are built once at construction; only `page` may
+    change afterwards (it is updated while paginating).
     """
     q: Optional[str] = None  # Optional: search query (max 500 chars)
     country: Optional[str] = None  # Single country code only
@@ -239,11 +278,10 @@ class TopHeadlinesQuery:
     sources: Optional[List[str]] = None  # Max 20 sources (cannot mix with country/category)
     pageSize: int = 100  # Max 100
     page: int = 1
+    _params: Dict[str, Any] = field(default=None, init=False, repr=False, compare=False)
 
-    def to_api_params(self) -> Dict[str, Any]:
-        """Convert to NewsAPI query parameters."""
+    def __post_init__(self):
         params: Dict[str, Any] = {
-            'page': self.page,
             'pageSize': min(self.pageSize, 100)
         }
 
@@ -260,10 +298,16 @@ class TopHeadlinesQuery:
             if self.category:
                 params['category'] = self.category
 
+        self._params = params
+
+    def to_api_params(self) -> Dict[str, Any]:
+        """Convert to NewsAPI query parameters."""
+        params = dict(self._params)
+        params['page'] = self.page
         return params
 
 
-@dataclass
+@dataclass(slots=True)
 class SourcesQuery:
     """
     API-compliant query for NewsAPI /sources endpoint.
@@ -272,9 +316,9 @@ class SourcesQuery:
     category: Optional[str] = None  # Single category only
     language: Optional[str] = None  # Single language code only
     country: Optional[str] = None  # Single country code only
+    _params: Dict[str, Any] = field(default=None, init=False, repr=False, compare=False)
 
-    def to_api_params(self) -> Dict[str, Any]:
-        """Convert to NewsAPI query parameters."""
+    def __post_init__(self):
         params: Dict[str, Any] = {}
 
         if self.category:
@@ -286,7 +330,20 @@ class SourcesQuery:
         if self.country:
             params['country'] = self.country
 
-        return params
+        self._params = params
+
+    def to_api_params(self) -> Dict[str, Any]:
+        """Convert to NewsAPI query parameters."""
+        return dict(self._params)
+
+
+# Code-list fields on UserQuery and the validator that filters each one
+_CODE_FIELDS = (
+    ('searchIn', validate_searchIn),
+    ('languages', validate_language_codes),
+    ('countries', validate_country_code),
+    ('categories', validate_categories),
+)
 
 
 # ============================================================================
@@ -294,7 +351,7 @@ class SourcesQuery:
 # This class accepts flexible parameters and generates API-compliant queries
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class UserQuery:
     """
     User-facing query class that can generate requests for all three NewsAPI endpoints.
@@ -322,37 +379,59 @@ class UserQuery:
     pageSize: int = 100
     max_results: int = 100  # Default limit on total results returned
 
+    # Sources split into groups of 20, computed once in __post_init__
+    _source_chunks: tuple = field(default=(None,), init=False, repr=False, compare=False)
+
     def __post_init__(self):
         """Validate and normalize user input"""
-        # Validate query string if provided
-        if self.q:
-            self.q = validate_query_string(self.q)
+        self._normalize_user_query()
 
-        # Validate searchIn
-        self.searchIn = validate_searchIn(self.searchIn)
+        # Chunk sources into groups of 20 (NewsAPI limit per request); tuples are
+        # shared by every generated query, so they must stay immutable
+        if self.sources:
+            self._source_chunks = tuple(
+                tuple(self.sources[i:i+20]) for i in range(0, len(self.sources), 20)
+            )
 
-        # Validate domains
-        self.domains = validate_domains(self.domains)
-        self.excludeDomains = validate_domains(self.excludeDomains)
+    def _normalize_user_query(self) -> None:
+        """
+        Validate every user-supplied field in one pass.
 
-        # Validate languages
-        self.languages = validate_language_codes(self.languages)
+        Code-list fields go through their validators (which log rejected values);
+        unset fields skip the call entirely.
+        """
+        # Validate query string if provided
+        if self.q:
+            self.q = validate_query_string(self.q)
 
-        # Validate countries
-        self.countries = validate_country_code(self.countries)
+        for name, validate in _CODE_FIELDS:
+            values = getattr(self, name)
+            setattr(self, name, validate(values) if values else None)
 
-        # Validate categories
-        self.categories = validate_categories(self.categories)
+        # Domains need the (memoized) validators check, so only run it when present
+        if self.domains:
+            self.domains = validate_domains(self.domains)
+        if self.excludeDomains:
+            self.excludeDomains = validate_domains(self.excludeDomains)
 
-        # Validate sortBy
-        self.sortBy = validate_sortBy(self.sortBy)
+        if self.sortBy:
+            self.sortBy = validate_sortBy(self.sortBy)
 
         # Convert date strings to datetime objects if needed
         if self.from_date and isinstance(self.from_date, str):
-            self.from_date = datetime.fromisoformat(self.from_date.replace('Z', '+00:00'))
+            self.from_date = _parse_iso_datetime(self.from_date)
 
         if self.to_date and isinstance(self.to_date, str):
-            self.to_date = datetime.fromisoformat(self.to_date.replace('Z', '+00:00'))
+            self.to_date = _parse_iso_datetime(self.to_date)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Shallow dict of the user-facing fields.
+
+        Cheaper than dataclasses.asdict(), which deep-copies every list, and
+        leaves out the internal source chunks.
+        """
+        return {name: getattr(self, name) for name in _USER_QUERY_FIELDS}
 
     def generate_everything_queries(self) -> Iterator[EverythingQuery]:
         """
@@ -365,15 +444,9 @@ class UserQuery:
         # Determine languages to iterate (default to None for API default)
         langs = self.languages if self.languages else [None]
 
-        # Chunk sources into groups of 20
-        if self.sources:
-            source_chunks = [self.sources[i:i+20] for i in range(0, len(self.sources), 20)]
-        else:
-            source_chunks = [None]
-
         # Generate queries for each combination of language and source chunk
         for lang in langs:
-            for source_chunk in source_chunks:
+            for source_chunk in self._source_chunks:
                 yield EverythingQuery(
                     q=self.q,
                     searchIn=self.searchIn,
@@ -395,8 +468,7 @@ class UserQuery:
         """
         # If sources provided, chunk them and don't use country/category
         if self.sources:
-            source_chunks = [self.sources[i:i+20] for i in range(0, len(self.sources), 20)]
-            for source_chunk in source_chunks:
+            for source_chunk in self._source_chunks:
                 yield TopHeadlinesQuery(
                     q=self.q,
                     sources=source_chunk,
@@ -427,21 +499,27 @@ class UserQuery:
         Generate SourcesQuery instances from user input.
         Iterates through all combinations of category, language, and country.
         """
-        # Get all combinations
+        if not (self.categories or self.languages or self.countries):
+            yield SourcesQuery()  # Get all sources
+            return
+
+        # Get all combinations; at least one filter is set in every combination
         categories = self.categories if self.categories else [None]
         languages = self.languages if self.languages else [None]
         countries = self.countries if self.countries else [None]
 
         for category, language, country in itertools.product(categories, languages, countries):
-            if category is None and language is None and country is None:
-                yield SourcesQuery()  # Get all sources
-            else:
-                yield SourcesQuery(
-                    category=category,
-                    language=language,
-                    country=country
-                )
-@dataclass
+            yield SourcesQuery(
+                category=category,
+                language=language,
+                country=country
+            )
+
+
+_USER_QUERY_FIELDS = tuple(f.name for f in fields(UserQuery) if f.init)
+
+
+@dataclass(slots=True)
 class Source:
     id: str
     name: str
@@ -451,7 +529,7 @@ class Source:
     language: Optional[str] = None
     country: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Article:
     """Represents a news article"""
 
@@ -468,7 +546,7 @@ class Article:
     def __post_init__(self):
         # Convert string dates to datetime if needed
         if isinstance(self.published_at, str):
-            self.published_at = datetime.fromisoformat(self.published_at)
+            self.published_at = _parse_iso_datetime(self.published_at)
 
     @classmethod
     def from_newsapi(cls, api_data: Dict[str, Any]) -> 'Article':
@@ -509,7 +587,7 @@ class Article:
         return f"Article(title='{self.title[:50]}...', url='{self.url}')"
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """Represents the result of a news search"""
 
@@ -523,3 +601,8 @@ class SearchResult:
         self.articles.append(article)
         self.total_found = len(self.articles)
 
+    def extend_articles(self, articles: Iterable[Article]) -> None:
+        """Add several articles to the results at once"""
+        self.articles.extend(articles)
+        self.total_found = len(self.articles)
+
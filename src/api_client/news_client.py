@@ -4,12 +4,30 @@ News API client for fetching articles from NewsAPI.org
 This is the production client for Azure deployment (USE_MCP=false).
 For development with MCP servers, use MCPNewsClient instead.
 """
+import itertools
 import logging
-from typing import List, Optional, Dict, Any
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Callable, Iterable, Sequence
 from datetime import datetime, timedelta
+import orjson
 import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .models import UserQuery, EverythingQuery, TopHeadlinesQuery, SourcesQuery, Article, SearchResult
 from ..config.settings import get_settings
+from ..config.constants import (
+    DEFAULT_TIMEOUT_SECONDS,
+    MAX_RETRIES,
+    RETRY_BACKOFF_FACTOR,
+    RETRY_STATUS_CODES,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    NEWSAPI_MAX_CONCURRENT_REQUESTS,
+    NEWSAPI_CACHE_MAXSIZE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +37,14 @@ class NewsAPIClient:
 
     BASE_URL = "https://newsapi.org/v2"
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_ttl: Optional[int] = None):
         """
         Initialize the NewsAPI client.
 
         Args:
             api_key: NewsAPI key. If not provided, uses settings.news_api_key
+            cache_ttl: Seconds to reuse responses. If not provided, uses
+                settings.newsapi_cache_ttl; 0 disables response caching
         """
         settings = get_settings()
         self.api_key = api_key or settings.news_api_key
@@ -34,13 +54,46 @@ class NewsAPIClient:
         self.session = requests.Session()
         self.session.headers.update({
             'X-Api-Key': self.api_key,
-            'User-Agent': 'NewsAggregator/1.0'
+            'User-Agent': 'NewsAggregator/1.0',
+            'Connection': 'keep-alive'
         })
 
+        # Keep TLS connections alive across calls; the pool must be large enough
+        # for concurrent query variants to share it without discarding sockets.
+        # Transient upstream failures are retried; 429 is not, since NewsAPI
+        # rate limits are quota windows that a quick retry cannot clear
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_CODES,
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Caps in-flight NewsAPI requests across every concurrent search issued
+        # through this client, not just within a single query fan-out
+        self._request_slots = threading.BoundedSemaphore(NEWSAPI_MAX_CONCURRENT_REQUESTS)
+
+        # Short-lived cache of decoded responses; identical requests repeat often
+        # across query variants and back-to-back runs
+        if cache_ttl is None:
+            cache_ttl = settings.newsapi_cache_ttl
+        self._response_cache = (
+            TTLCache(maxsize=NEWSAPI_CACHE_MAXSIZE, ttl=cache_ttl) if cache_ttl > 0 else None
+        )
+        self._cache_lock = threading.Lock()
+
     def search_everything(self, user_query: UserQuery) -> Dict[str, Any]:
         """
         Search for articles using the /everything endpoint with automatic pagination.
 
+        Query variants generated by the UserQuery are fetched concurrently.
+
         Args:
             user_query: UserQuery object with search parameters
 
@@ -50,86 +103,12 @@ class NewsAPIClient:
         endpoint = f"{self.BASE_URL}/everything"
 
         try:
-            all_articles = []
-            total_results_across_queries = 0
-
-            # Iterate through all generated API-compliant queries
-            for api_query in user_query.generate_everything_queries():
+            api_queries = self._unique_queries(user_query.generate_everything_queries())
+            for api_query in api_queries:
                 logger.info(f"Searching NewsAPI /everything for: {api_query.q} (language: {api_query.language or 'all'})")
 
-                # Paginate through results for this specific query
-                current_page = 1
-                query_articles = []
-
-                while True:
-                    # Update page number
-                    api_query.page = current_page
-                    params = api_query.to_api_params()
-
-                    response = self.session.get(endpoint, params=params, timeout=30)
-                    response.raise_for_status()
-
-                    data = response.json()
-
-                    if data.get('status') != 'ok':
-                        logger.error(f"NewsAPI error: {data.get('message', 'Unknown error')}")
-                        if current_page == 1:
-                            # First page failed, skip this query
-                            break
-                        else:
-                            # Subsequent page failed, use what we have
-                            logger.warning(f"Error on page {current_page}, stopping pagination for this query")
-                            break
-
-                    page_articles = data.get('articles', [])
-                    query_articles.extend(page_articles)
-                    query_total = data.get('totalResults', 0)
-
-                    logger.info(f"Page {current_page}: retrieved {len(page_articles)} articles")
-
-                    # Stop pagination if:
-                    # 1. Fewer than pageSize results (no more pages)
-                    # 2. Collected all available results for this query
-                    # 3. Reached max_results limit across all queries
-                    if (len(page_articles) < api_query.pageSize or
-                        len(query_articles) >= query_total or
-                        len(all_articles) + len(query_articles) >= user_query.max_results):
-                        break
-
-                    current_page += 1
-
-                # Add results from this query to total
-                all_articles.extend(query_articles)
-                total_results_across_queries += len(query_articles)
-
-                logger.info(f"Collected {len(query_articles)} articles from this query variant")
-
-                # Stop if we've reached the max_results limit
-                if len(all_articles) >= user_query.max_results:
-                    logger.info(f"Reached max_results limit of {user_query.max_results}")
-                    break
-
-            # Remove duplicates based on URL
-            unique_articles = {}
-            for article in all_articles:
-                url = article.get('url')
-                if url and url not in unique_articles:
-                    unique_articles[url] = article
-
-            final_articles = list(unique_articles.values())
-
-            # Truncate to max_results if needed
-            if len(final_articles) > user_query.max_results:
-                final_articles = final_articles[:user_query.max_results]
-                logger.info(f"Truncated to max_results limit of {user_query.max_results}")
-
-            logger.info(f"Total: {len(final_articles)} unique articles (removed {len(all_articles) - len(final_articles)} duplicates)")
-
-            return {
-                'status': 'ok',
-                'totalResults': len(final_articles),
-                'articles': final_articles
-            }
+            pages = self._fetch_all(endpoint, api_queries, user_query.max_results)
+            return self._merge_articles(pages, user_query.max_results)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching articles from NewsAPI: {e}")
@@ -139,6 +118,8 @@ class NewsAPIClient:
         """
         Get top headlines using the /top-headlines endpoint with automatic pagination.
 
+        Query variants generated by the UserQuery are fetched concurrently.
+
         Args:
             user_query: UserQuery object with search parameters
 
@@ -148,85 +129,14 @@ class NewsAPIClient:
         endpoint = f"{self.BASE_URL}/top-headlines"
 
         try:
-            all_articles = []
-
-            # Iterate through all generated API-compliant queries
-            for api_query in user_query.generate_headlines_queries():
+            api_queries = self._unique_queries(user_query.generate_headlines_queries())
+            for api_query in api_queries:
                 # Build descriptive log message
                 query_desc = api_query.q or f"{api_query.country or 'all'}/{api_query.category or 'all'}"
                 logger.info(f"Fetching top headlines: {query_desc}")
 
-                # Paginate through results for this specific query
-                current_page = 1
-                query_articles = []
-
-                while True:
-                    # Update page number
-                    api_query.page = current_page
-                    params = api_query.to_api_params()
-
-                    response = self.session.get(endpoint, params=params, timeout=30)
-                    response.raise_for_status()
-
-                    data = response.json()
-
-                    if data.get('status') != 'ok':
-                        logger.error(f"NewsAPI error: {data.get('message', 'Unknown error')}")
-                        if current_page == 1:
-                            # First page failed, skip this query
-                            break
-                        else:
-                            # Subsequent page failed, use what we have
-                            logger.warning(f"Error on page {current_page}, stopping pagination for this query")
-                            break
-
-                    page_articles = data.get('articles', [])
-                    query_articles.extend(page_articles)
-                    query_total = data.get('totalResults', 0)
-
-                    logger.info(f"Page {current_page}: retrieved {len(page_articles)} articles")
-
-                    # Stop pagination if:
-                    # 1. Fewer than pageSize results (no more pages)
-                    # 2. Collected all available results for this query
-                    # 3. Reached max_results limit across all queries
-                    if (len(page_articles) < api_query.pageSize or
-                        len(query_articles) >= query_total or
-                        len(all_articles) + len(query_articles) >= user_query.max_results):
-                        break
-
-                    current_page += 1
-
-                # Add results from this query to total
-                all_articles.extend(query_articles)
-                logger.info(f"Collected {len(query_articles)} articles from this query variant")
-
-                # Stop if we've reached the max_results limit
-                if len(all_articles) >= user_query.max_results:
-                    logger.info(f"Reached max_results limit of {user_query.max_results}")
-                    break
-
-            # Remove duplicates based on URL
-            unique_articles = {}
-            for article in all_articles:
-                url = article.get('url')
-                if url and url not in unique_articles:
-                    unique_articles[url] = article
-
-            final_articles = list(unique_articles.values())
-
-            # Truncate to max_results if needed
-            if len(final_articles) > user_query.max_results:
-                final_articles = final_articles[:user_query.max_results]
-                logger.info(f"Truncated to max_results limit of {user_query.max_results}")
-
-            logger.info(f"Total: {len(final_articles)} unique articles (removed {len(all_articles) - len(final_articles)} duplicates)")
-
-            return {
-                'status': 'ok',
-                'totalResults': len(final_articles),
-                'articles': final_articles
-            }
+            pages = self._fetch_all(endpoint, api_queries, user_query.max_results)
+            return self._merge_articles(pages, user_query.max_results)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching top headlines from NewsAPI: {e}")
@@ -236,6 +146,8 @@ class NewsAPIClient:
         """
         Get available news sources using the /sources endpoint.
 
+        Query variants generated by the UserQuery are fetched concurrently.
+
         Args:
             user_query: UserQuery object with filter parameters
 
@@ -245,10 +157,8 @@ class NewsAPIClient:
         endpoint = f"{self.BASE_URL}/sources"
 
         try:
-            all_sources = []
-
-            # Iterate through all generated API-compliant queries
-            for api_query in user_query.generate_sources_queries():
+            api_queries = self._unique_queries(user_query.generate_sources_queries())
+            for api_query in api_queries:
                 # Build descriptive log message
                 filters = []
                 if api_query.category:
@@ -261,20 +171,11 @@ class NewsAPIClient:
                 filter_str = ", ".join(filters) if filters else "all"
                 logger.info(f"Fetching sources: {filter_str}")
 
-                params = api_query.to_api_params()
-
-                response = self.session.get(endpoint, params=params, timeout=30)
-                response.raise_for_status()
-
-                data = response.json()
-
-                if data.get('status') != 'ok':
-                    logger.error(f"NewsAPI error: {data.get('message', 'Unknown error')}")
-                    continue  # Skip this query and try the next one
-
-                sources = data.get('sources', [])
+            all_sources = []
+            for sources in self._map_concurrently(
+                lambda api_query: self._fetch_sources(endpoint, api_query), api_queries
+            ):
                 all_sources.extend(sources)
-                logger.info(f"Retrieved {len(sources)} sources")
 
             # Remove duplicates based on source ID
             unique_sources = {}
@@ -296,6 +197,201 @@ class NewsAPIClient:
             logger.error(f"Error fetching sources from NewsAPI: {e}")
             return {'status': 'error', 'sources': []}
 
+    def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Issue a single GET against NewsAPI and return the decoded JSON body.
+
+        Responses are served from a TTL cache keyed on the endpoint and params.
+        Only successful responses are cached, so errors are retried next time.
+        The cache holds the raw body and every hit decodes it again, so callers
+        get their own article dicts and may mutate them freely.
+        """
+        if self._response_cache is None:
+            return orjson.loads(self._request(endpoint, params))
+
+        cache_key = (endpoint, tuple(sorted(params.items())))
+        with self._cache_lock:
+            cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Serving cached NewsAPI response for {endpoint}")
+            return orjson.loads(cached)
+
+        body = self._request(endpoint, params)
+        data = orjson.loads(body)
+        if data.get('status') == 'ok':
+            with self._cache_lock:
+                self._response_cache[cache_key] = body
+        return data
+
+    def _request(self, endpoint: str, params: Dict[str, Any]) -> bytes:
+        """Send a GET to NewsAPI, bounded by the client-wide concurrency limit; returns the raw body."""
+        with self._request_slots:
+            response = self.session.get(endpoint, params=params, timeout=DEFAULT_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return response.content
+
+    @staticmethod
+    def _unique_queries(api_queries: Iterable[Any]) -> List[Any]:
+        """Drop query variants that would issue exactly the same request."""
+        seen = set()
+        unique = []
+        for api_query in api_queries:
+            key = tuple(sorted(api_query.to_api_params().items()))
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(api_query)
+        return unique
+
+    def _map_concurrently(self, fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        """
+        Apply fn to every item on a thread pool, preserving input order.
+
+        NewsAPI calls are I/O bound, so independent query variants complete in
+        roughly the time of the slowest one instead of the sum of all of them.
+        """
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+
+        max_workers = min(len(items), NEWSAPI_MAX_CONCURRENT_REQUESTS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fn, items))
+
+    def _fetch_all(self, endpoint: str, api_queries: List[Any], max_results: int) -> List[List[Dict[str, Any]]]:
+        """
+        Paginate query variants until max_results articles are collected; returns their pages in variant order.
+
+        Variants run concurrently in waves sized to the articles still needed (a
+        variant's first page holds at most pageSize of them), so once earlier
+        variants have filled max_results the remaining ones are never requested.
+        """
+        pages: List[List[Dict[str, Any]]] = []
+        collected = 0
+        next_query = 0
+
+        while next_query < len(api_queries) and collected < max_results:
+            remaining = max_results - collected
+            wave_size = min(
+                NEWSAPI_MAX_CONCURRENT_REQUESTS,
+                math.ceil(remaining / api_queries[next_query].pageSize)
+            )
+            wave = api_queries[next_query:next_query + wave_size]
+            next_query += len(wave)
+
+            for query_pages in self._map_concurrently(
+                lambda api_query: self._paginate(endpoint, api_query, remaining), wave
+            ):
+                pages.extend(query_pages)
+                collected += sum(map(len, query_pages))
+
+        if next_query < len(api_queries):
+            logger.info(f"Reached max_results limit of {max_results}; skipped {len(api_queries) - next_query} query variants")
+        return pages
+
+    def _paginate(self, endpoint: str, api_query: Any, max_results: int) -> List[List[Dict[str, Any]]]:
+        """
+        Fetch pages for a single API-compliant query until exhausted or max_results is hit.
+
+        Page 1 reports totalResults, which fixes how many further pages are needed;
+        those are then requested concurrently rather than one round-trip at a time.
+        Pages are returned as-is rather than copied into one growing list; the
+        merge step walks them in order.
+
+        Args:
+            endpoint: NewsAPI endpoint URL
+            api_query: EverythingQuery or TopHeadlinesQuery
+            max_results: Upper bound on articles to collect for this query
+
+        Returns:
+            List of pages, each a list of raw article dicts
+        """
+        params = api_query.to_api_params()
+        data = self._fetch_page(endpoint, params, 1)
+        if data is None:
+            return []
+
+        page_articles = data.get('articles', [])
+        pages = [page_articles]
+        query_total = data.get('totalResults', 0)
+
+        # Stop pagination if:
+        # 1. Fewer than pageSize results (no more pages)
+        # 2. Collected all available results for this query
+        # 3. Reached max_results limit
+        page_size = api_query.pageSize
+        if (len(page_articles) < page_size or
+            len(page_articles) >= query_total or
+            len(page_articles) >= max_results):
+            logger.info(f"Collected {len(page_articles)} articles from this query variant")
+            return pages
+
+        num_pages = min(
+            math.ceil(query_total / page_size),
+            math.ceil(max_results / page_size)
+        )
+        for data in self._map_concurrently(
+            lambda page: self._fetch_page(endpoint, params, page), range(2, num_pages + 1)
+        ):
+            if data is not None:
+                pages.append(data.get('articles', []))
+
+        logger.info(f"Collected {sum(map(len, pages))} articles from this query variant")
+        return pages
+
+    def _fetch_page(self, endpoint: str, params: Dict[str, Any], page: int) -> Optional[Dict[str, Any]]:
+        """Fetch one page of a paginated query; None if NewsAPI reported an error."""
+        data = self._get(endpoint, {**params, 'page': page})
+
+        if data.get('status') != 'ok':
+            logger.error(f"NewsAPI error: {data.get('message', 'Unknown error')}")
+            if page > 1:
+                # Subsequent page failed, use what the other pages returned
+                logger.warning(f"Error on page {page}, skipping it for this query")
+            return None
+
+        logger.info(f"Page {page}: retrieved {len(data.get('articles', []))} articles")
+        return data
+
+    def _fetch_sources(self, endpoint: str, api_query: SourcesQuery) -> List[Dict[str, Any]]:
+        """Fetch sources for a single API-compliant sources query."""
+        data = self._get(endpoint, api_query.to_api_params())
+
+        if data.get('status') != 'ok':
+            logger.error(f"NewsAPI error: {data.get('message', 'Unknown error')}")
+            return []  # Skip this query and let the others through
+
+        sources = data.get('sources', [])
+        logger.info(f"Retrieved {len(sources)} sources")
+        return sources
+
+    def _merge_articles(self, pages: Iterable[List[Dict[str, Any]]], max_results: int) -> Dict[str, Any]:
+        """Deduplicate articles by URL in a single pass, stopping at max_results."""
+        # Keyed on the URL strings themselves: the set only holds references to
+        # strings the articles already own, and str caches its hash, so digesting
+        # URLs to integers would add hashing work without saving memory
+        seen_urls = set()
+        final_articles = []
+        scanned = 0
+
+        for article in itertools.chain.from_iterable(pages):
+            scanned += 1
+            url = article.get('url')
+            if not url or url in seen_urls:
+                continue
+            seen_urls.add(url)
+            final_articles.append(article)
+            if len(final_articles) >= max_results:
+                logger.info(f"Reached max_results limit of {max_results}")
+                break
+
+        logger.info(f"Total: {len(final_articles)} unique articles (skipped {scanned - len(final_articles)} duplicates)")
+
+        return {
+            'status': 'ok',
+            'totalResults': len(final_articles),
+            'articles': final_articles
+        }
+
     def close(self):
         """Close the session"""
         self.session.close()
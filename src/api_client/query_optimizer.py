@@ -4,22 +4,129 @@ LLM-powered query optimization for generating optimal search parameters
 NOTE: This module is optional and primarily useful for programmatic/batch processing.
 When using MCP servers, query optimization happens implicitly through the LLM.
 """
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+import threading
+from dataclasses import fields
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Iterable, Iterator
 from datetime import datetime, timedelta
-import json
-from anthropic import Anthropic
+import re
+import orjson
+from cachetools import TTLCache
 from .models import UserQuery
+from ..config.constants import QUERY_OPTIMIZATION_CACHE_MAXSIZE, QUERY_OPTIMIZATION_CACHE_TTL
+
+if TYPE_CHECKING:
+    from .semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
+# Parsed LLM optimizations keyed by (provider, model, user input); shared across
+# optimizer instances so repeated prompts in a batch skip the LLM round-trip
+_optimization_cache = TTLCache(maxsize=QUERY_OPTIMIZATION_CACHE_MAXSIZE, ttl=QUERY_OPTIMIZATION_CACHE_TTL)
+_optimization_cache_lock = threading.Lock()
+
+# UserQuery constructor arguments taken straight from the LLM output; q and the
+# dates are handled separately
+_USER_QUERY_FIELDS = frozenset(
+    f.name for f in fields(UserQuery) if f.init
+) - {'q', 'from_date', 'to_date'}
+
+# Expected JSON shape of each UserQuery field, checked before construction so
+# malformed LLM output never reaches the validators
+_STRING_LIST_FIELDS = frozenset({
+    'searchIn', 'sources', 'domains', 'excludeDomains', 'languages', 'countries', 'categories'
+})
+_INT_FIELDS = frozenset({'pageSize', 'max_results'})
+
+
+def _has_expected_type(key: str, value: Any) -> bool:
+    """Cheap schema check for a single LLM-provided UserQuery field"""
+    if key in _STRING_LIST_FIELDS:
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    if key in _INT_FIELDS:
+        return isinstance(value, int) and not isinstance(value, bool) and value > 0
+    return isinstance(value, str)
+
+# JSON object inside a ``` or ```json fence, else the outermost {...} in the text
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def _parse_iso(value: Any) -> Optional[datetime]:
+    """Parse an ISO date from the LLM, returning None if it is missing or invalid"""
+    if not value:
+        return None
+    if not isinstance(value, str):
+        logger.warning(f"Invalid date format: {value!r}")
+        return None
+    return _parse_iso_str(value)
+
+
+@lru_cache(maxsize=256)
+def _parse_iso_str(value: str) -> Optional[datetime]:
+    """Memoized: queries from one response usually share the same date range"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as e:
+        logger.warning(f"Invalid date format: {e}")
+        return None
+
+
+def _iter_streamed_queries(chunks: Iterable[str], received: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse a streamed {"queries": [...]} response.
+
+    Yields each object of the top-level array as soon as its closing brace
+    arrives. Every chunk is also appended to received so the caller can parse
+    the complete response afterwards.
+    """
+    stack: List[str] = []
+    in_string = escape = False
+    current: Optional[List[str]] = None  # characters of the query object being read
+
+    for chunk in chunks:
+        received.append(chunk)
+        for ch in chunk:
+            if current is not None:
+                current.append(ch)
+
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == '\\':
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+                continue
+
+            if ch == '"':
+                in_string = True
+            elif ch == '{' or ch == '[':
+                stack.append(ch)
+                if ch == '{' and stack == ['{', '[', '{']:
+                    current = [ch]
+            elif ch == '}' or ch == ']':
+                if stack:
+                    stack.pop()
+                if current is not None and stack == ['{', '[']:
+                    try:
+                        yield orjson.loads(''.join(current))
+                    except orjson.JSONDecodeError as e:
+                        logger.warning(f"Skipping malformed streamed query: {e}")
+                    current = None
+
 
 class QueryOptimizer:
     """LLM-powered query optimizer for news search"""
 
-    OPTIMIZATION_PROMPT = """You are a news search expert. Your job is to transform user input into optimized search parameters for a news API.
+    # Static instructions sent as a cached system prompt; only the user input
+    # changes between calls. Kept above the 1024-token minimum for prompt caching.
+    SYSTEM_PROMPT = """You are a news search expert. Your job is to transform user input into optimized search parameters for a news API.
 
-User Input: {user_input}
+The user's request is provided in the user message.
 
 Analyze the user's request and generate 1-5 search queries with optimal parameters. Each query should explore a different angle, perspective, or synonym for the topic.
 
@@ -47,9 +154,9 @@ Optional Parameters (per query):
 - max_results: total number of results to request
 
 Return a valid JSON object with an array of 1-5 queries. Each query should match this structure (all fields are optional except "q"):
-{{
+{
   "queries": [
-    {{
+    {
       "q": "first optimized search query string",
       "searchIn": ["title", "description"],
       "sources": ["source name 1", "source name 2"],
@@ -62,20 +169,20 @@ Return a valid JSON object with an array of 1-5 queries. Each query should match
       "countries": ["us", "gb"],
       "categories": ["technology", "business"]
       "max_results": 100
-    }},
-    {{
+    },
+    {
       "q": "alternative angle on the same topic",
       "sortBy": "relevancy",
       "languages": ["en", "es"],
       "max_results": 100
-    }},
-    {{
+    },
+    {
       "q": "third perspective using synonyms",
       "categories": ["technology"],
       "sortBy": "popularity"
-    }}
+    }
   ]
-}}
+}
 
 Guidelines:
 - Generate 1-5 queries exploring different angles of the user's request
@@ -84,14 +191,70 @@ Guidelines:
 - Each query can have different parameters based on what makes sense for that angle
 - The "q" field is required for each query, all other fields are optional
 
+Examples:
+
+User: What's the latest on the Mars rover?
+{
+  "queries": [
+    {"q": "\\"Mars rover\\"", "sortBy": "publishedAt"},
+    {"q": "Perseverance OR Curiosity AND Mars", "sortBy": "publishedAt"},
+    {"q": "NASA Mars mission", "searchIn": ["title", "description"]}
+  ]
+}
+
+User: Spanish and French coverage of the Champions League final, excluding betting sites
+{
+  "queries": [
+    {"q": "\\"Champions League\\" final", "languages": ["es", "fr"], "excludeDomains": ["bet365.com", "williamhill.com"]},
+    {"q": "UEFA final", "languages": ["es", "fr"], "sortBy": "popularity"}
+  ]
+}
+
+User: Business headlines from the US and UK this week about interest rates
+{
+  "queries": [
+    {"q": "interest rates", "countries": ["us", "gb"], "categories": ["business"], "sortBy": "publishedAt"},
+    {"q": "\\"Federal Reserve\\" OR \\"Bank of England\\" AND rates", "categories": ["business"], "sortBy": "publishedAt"},
+    {"q": "inflation AND (\\"rate hike\\" OR \\"rate cut\\")", "sortBy": "relevancy"}
+  ]
+}
+
+User: Health research stories from Reuters and the BBC
+{
+  "queries": [
+    {"q": "medical research", "sources": ["reuters", "bbc-news"], "sortBy": "publishedAt"},
+    {"q": "\\"clinical trial\\" OR \\"new study\\"", "sources": ["reuters", "bbc-news"]},
+    {"q": "vaccine OR treatment breakthrough", "categories": ["health", "science"], "sortBy": "relevancy"}
+  ]
+}
+
+Only return the JSON object, no other text."""
+
+    # User message for optimize_queries; the system prompt stays shared (and cached)
+    BATCH_PROMPT = """Optimize each of the following user requests independently.
+
+User requests (JSON array):
+{user_inputs}
+
+Return a valid JSON object with one entry per request, in the same order:
+{
+  "batch": [
+    {"queries": [...]},
+    {"queries": [...]}
+  ]
+}
+
 Only return the JSON object, no other text."""
+    # Split once so each call only concatenates around the inputs
+    _BATCH_PROMPT_HEAD, _BATCH_PROMPT_TAIL = BATCH_PROMPT.split("{user_inputs}")
 
     def __init__(
         self,
         provider: str = "anthropic",
         api_key: Optional[str] = None,
         model: Optional[str] = None,
-        azure_endpoint: Optional[str] = None
+        azure_endpoint: Optional[str] = None,
+        semantic_cache: Optional['SemanticCache'] = None
     ):
         """
         Initialize the query optimizer.
@@ -101,15 +264,20 @@ Only return the JSON object, no other text."""
             api_key: API key for the provider
             model: Model name to use
             azure_endpoint: Azure OpenAI endpoint (for Azure provider)
+            semantic_cache: Optional cache that also answers paraphrased inputs
         """
         self.provider = provider.lower()
+        self.semantic_cache = semantic_cache
 
+        # LLM SDKs are imported on demand; they are slow to load and only one is used
         if self.provider == "anthropic":
+            from anthropic import Anthropic
             from ..config.settings import get_settings
             settings = get_settings()
             self.client = Anthropic(api_key=api_key or settings.anthropic_api_key)
             self.model = model or "claude-sonnet-4-5-20250929"
         elif self.provider == "azure":
+            from openai import AzureOpenAI
             from ..config.settings import get_settings
             settings = get_settings()
             self.client = AzureOpenAI(
@@ -134,14 +302,19 @@ Only return the JSON object, no other text."""
         logger.info(f"Optimizing query: {user_input}")
 
         try:
-            # Generate optimization using LLM
-            prompt = self.OPTIMIZATION_PROMPT.format(user_input=user_input)
-            response_text = self._call_llm(prompt)
+            optimization = self._cached_optimization(user_input)
 
-            # Parse JSON response
-            optimization = self._parse_response(response_text)
+            if optimization is None:
+                # Generate optimization using LLM
+                response_text = self._call_llm(user_input)
 
-            # Convert to UserQuery objects
+                # Parse JSON response
+                optimization = self._parse_response(response_text)
+                self._store_optimization(user_input, optimization)
+            else:
+                logger.info("Using cached query optimization")
+
+            # Convert to UserQuery objects (rebuilt each time; UserQuery is mutable)
             user_queries = self._build_user_queries(optimization)
 
             logger.info(f"Generated {len(user_queries)} optimized queries")
@@ -153,39 +326,165 @@ Only return the JSON object, no other text."""
             # Fallback to basic query
             return self._fallback_queries(user_input)
 
-    def _call_llm(self, prompt: str) -> str:
+    def iter_optimized_queries(self, user_input: str) -> Iterator[UserQuery]:
+        """
+        Stream optimized queries, yielding each one as soon as the LLM finishes it.
+
+        Lets callers start searching with the first query while the rest are still
+        being generated. Use optimize_query when the full list is needed up front.
+
+        Args:
+            user_input: Natural language user input
+
+        Yields:
+            UserQuery objects with optimized parameters
+        """
+        optimization = self._cached_optimization(user_input)
+        if optimization is not None:
+            logger.info("Using cached query optimization")
+            yield from self._build_user_queries(optimization)
+            return
+
+        received: List[str] = []
+        yielded = 0
+        try:
+            for query_dict in _iter_streamed_queries(self._stream_llm(user_input), received):
+                for user_query in self._build_user_queries({'queries': [query_dict]}):
+                    yielded += 1
+                    yield user_query
+
+            self._store_optimization(user_input, self._parse_response(''.join(received)))
+            logger.info(f"Streamed {yielded} optimized queries")
+
+        except Exception as e:
+            logger.error(f"Error streaming query optimization: {e}", exc_info=True)
+            if not yielded:
+                logger.warning(f"Falling back to basic query for input: {user_input[:100]}")
+                yield from self._fallback_queries(user_input)
+
+    async def optimize_query_async(self, user_input: str) -> List[UserQuery]:
+        """
+        Async variant of optimize_query for use inside an event loop.
+
+        The LLM call runs in a worker thread, so several inputs can be optimized
+        concurrently with asyncio.gather while sharing the same caches.
+        """
+        return await asyncio.to_thread(self.optimize_query, user_input)
+
+    def optimize_queries(self, user_inputs: List[str]) -> List[List[UserQuery]]:
+        """
+        Transform several user inputs with a single LLM call.
+
+        Inputs already in the cache are answered locally; the rest are sent
+        together. If the batched response cannot be used, each remaining input
+        falls back to optimize_query.
+
+        Args:
+            user_inputs: Natural language user inputs
+
+        Returns:
+            One list of UserQuery objects per input, in input order
+        """
+        optimizations = [self._cached_optimization(user_input) for user_input in user_inputs]
+        pending = [i for i, optimization in enumerate(optimizations) if optimization is None]
+
+        if len(pending) > 1:
+            logger.info(f"Optimizing {len(pending)} queries in one batch")
+            try:
+                batch_inputs = [user_inputs[i] for i in pending]
+                response_text = self._call_llm(
+                    f"{self._BATCH_PROMPT_HEAD}{orjson.dumps(batch_inputs).decode()}{self._BATCH_PROMPT_TAIL}"
+                )
+                batch = self._parse_response(response_text).get('batch')
+                if not isinstance(batch, list) or len(batch) != len(pending):
+                    raise ValueError(f"Expected {len(pending)} batch results, got {type(batch).__name__}")
+
+                for i, optimization in zip(pending, batch):
+                    if isinstance(optimization, dict):
+                        optimizations[i] = optimization
+                        self._store_optimization(user_inputs[i], optimization)
+
+            except Exception as e:
+                logger.warning(f"Batch optimization failed, optimizing inputs individually: {e}")
+
+        return [
+            self._build_user_queries(optimization) if optimization is not None
+            else self.optimize_query(user_input)
+            for user_input, optimization in zip(user_inputs, optimizations)
+        ]
+
+    def _cached_optimization(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """Look up a previous optimization by exact input, then by meaning"""
+        with _optimization_cache_lock:
+            optimization = _optimization_cache.get(self._cache_key(user_input))
+
+        if optimization is None and self.semantic_cache is not None:
+            optimization = self.semantic_cache.get(user_input)
+        return optimization
+
+    def _store_optimization(self, user_input: str, optimization: Dict[str, Any]) -> None:
+        """Remember an LLM optimization for later identical or similar inputs"""
+        with _optimization_cache_lock:
+            _optimization_cache[self._cache_key(user_input)] = optimization
+        if self.semantic_cache is not None:
+            self.semantic_cache.put(user_input, optimization)
+
+    def _cache_key(self, user_input: str) -> str:
+        """Exact-match cache key for an optimization request"""
+        return hashlib.md5(f"{self.provider}|{self.model}|{user_input}".encode()).hexdigest()
+
+    def _call_llm(self, user_input: str) -> str:
         """Call the LLM provider"""
         if self.provider == "anthropic":
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,
-                temperature=0.3,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            response = self.client.messages.create(**self._message_params(user_input))
             return response.content[0].text
 
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
+    def _stream_llm(self, user_input: str) -> Iterator[str]:
+        """Call the LLM provider, yielding response text as it is generated"""
+        if self.provider == "anthropic":
+            with self.client.messages.stream(**self._message_params(user_input)) as stream:
+                yield from stream.text_stream
+
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+    def _message_params(self, user_input: str) -> Dict[str, Any]:
+        """Anthropic request parameters shared by the blocking and streaming calls"""
+        return {
+            "model": self.model,
+            "max_tokens": 1024,
+            "temperature": 0.3,
+            "system": [
+                {
+                    "type": "text",
+                    "text": self.SYSTEM_PROMPT,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ],
+            "messages": [
+                {"role": "user", "content": user_input}
+            ]
+        }
+
     def _parse_response(self, response_text: str) -> Dict[str, Any]:
         """Parse LLM response into structured data"""
         try:
             # Try to extract JSON from response
-            # Handle cases where LLM might include markdown code blocks
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + 3
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-
-            return json.loads(response_text)
-
-        except json.JSONDecodeError as e:
+            # Handle cases where LLM might include markdown code blocks or prose
+            match = _FENCE_RE.search(response_text)
+            if match:
+                response_text = match.group(1)
+            else:
+                match = _JSON_OBJECT_RE.search(response_text)
+                if match:
+                    response_text = match.group(0)
+
+            return orjson.loads(response_text)
+
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response: {e}")
             logger.debug(f"Response text: {response_text}")
             raise
@@ -204,43 +503,28 @@ Only return the JSON object, no other text."""
 
             # Extract query string (required)
             q = query_dict.get('q')
-            if not q:
-                logger.warning("Skipping query without 'q' field")
+            if not q or not isinstance(q, str):
+                logger.warning("Skipping query without a valid 'q' field")
                 continue
 
             # Parse dates if provided
-            from_date = None
-            to_date = None
-
-            if 'from_date' in query_dict:
-                try:
-                    from_date = datetime.fromisoformat(query_dict['from_date'])
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Invalid from_date format: {e}")
-
-            if 'to_date' in query_dict:
-                try:
-                    to_date = datetime.fromisoformat(query_dict['to_date'])
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Invalid to_date format: {e}")
-
-            # Create UserQuery object
-            # UserQuery validation will handle all the field validation
-            user_query = UserQuery(
-                q=q,
-                searchIn=query_dict.get('searchIn'),
-                sources=query_dict.get('sources'),
-                domains=query_dict.get('domains'),
-                excludeDomains=query_dict.get('excludeDomains'),
-                from_date=from_date,
-                to_date=to_date,
-                sortBy=query_dict.get('sortBy'),
-                languages=query_dict.get('languages'),
-                countries=query_dict.get('countries'),
-                categories=query_dict.get('categories'),
-                pageSize=query_dict.get('pageSize', 100),
-                max_results=query_dict.get('max_results', 100)
-            )
+            from_date = _parse_iso(query_dict.get('from_date'))
+            to_date = _parse_iso(query_dict.get('to_date'))
+
+            # Create UserQuery object from the recognised fields in one unpack
+            # UserQuery validation will handle all the field validation. Lists
+            # are copied so callers editing a query can't change the cached entry
+            kwargs = {
+                key: list(value) if isinstance(value, list) else value
+                for key, value in query_dict.items()
+                if key in _USER_QUERY_FIELDS and value is not None
+            }
+            malformed = [key for key, value in kwargs.items() if not _has_expected_type(key, value)]
+            if malformed:
+                logger.warning(f"Ignoring malformed fields in query '{q}': {malformed}")
+                for key in malformed:
+                    del kwargs[key]
+            user_query = UserQuery(q=q, from_date=from_date, to_date=to_date, **kwargs)
 
             user_queries.append(user_query)
 
@@ -0,0 +1,262 @@
+"""
+Embedding-based cache for near-duplicate prompts.
+
+Paraphrased prompts ("latest EV news" vs "recent electric vehicle news") miss an
+exact-match cache but usually want the same answer. SemanticCache embeds each
+prompt and returns the cached value of the most similar previous prompt when the
+cosine similarity clears a threshold. Entries expire after a TTL, since a cached
+answer about the latest news goes stale. Embeddings are stored as int8 with one
+float32 scale per entry, a quarter of the memory of float32 vectors.
+
+Optional: requires numpy and sentence-transformers. When they are not installed
+the cache reports itself as disabled and every lookup misses. If numba is
+available the similarity scan is JIT-compiled and parallelized across cores.
+"""
+import logging
+import threading
+from functools import lru_cache
+from time import monotonic
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+import orjson
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+
+from ..config.constants import (
+    SEMANTIC_CACHE_MODEL,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_TTL_SECONDS,
+    SEMANTIC_CACHE_BATCH_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _quantize(embeddings):
+    """
+    Quantize rows of float32 embeddings to int8.
+
+    Each row is scaled so its largest component maps to 127; the returned
+    per-row scales turn an int8 dot product back into a cosine similarity.
+    """
+    scales = np.abs(embeddings).max(axis=1) / 127
+    scales[scales == 0] = 1
+    quantized = np.rint(embeddings / scales[:, np.newaxis]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+if njit is not None and np is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _best_match(matrix, scales, query):  # pragma: no cover - compiled
+        """Index and score of the row most similar to query (rows are quantized unit vectors)"""
+        n, dim = matrix.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(dim):
+                acc += matrix[i, j] * query[j]
+            scores[i] = acc * scales[i]
+
+        best = 0
+        for i in range(1, n):
+            if scores[i] > scores[best]:
+                best = i
+        return best, scores[best]
+else:
+    def _best_match(matrix, scales, query):
+        """Index and score of the row most similar to query (rows are quantized unit vectors)"""
+        scores = (matrix @ query) * scales
+        best = int(scores.argmax())
+        return best, scores[best]
+
+
+class SemanticCache:
+    """In-memory nearest-neighbour cache keyed by normalized prompt embeddings"""
+
+    def __init__(
+        self,
+        encoder: Optional[Callable[[str], Any]] = None,
+        model_name: str = SEMANTIC_CACHE_MODEL,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        ttl: float = SEMANTIC_CACHE_TTL_SECONDS
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            encoder: Callable mapping text to an embedding vector. Defaults to a
+                sentence-transformers model, loaded on first use.
+            model_name: sentence-transformers model used when no encoder is given
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Oldest entries are evicted beyond this size
+            ttl: Seconds an entry is served after it was added
+        """
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._encoder = encoder
+        self._model = None
+        self._embeddings = None  # (N, dim) int8 matrix of quantized unit vectors
+        self._scales = None  # (N,) float32 dequantization scale per row
+        self._added_at = None  # (N,) monotonic insertion time per row, ascending
+        self._values: List[Any] = []
+        self._lock = threading.Lock()
+
+        # The same prompt is embedded for the lookup and again for the insert
+        self._embed = lru_cache(maxsize=256)(self._encode)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lookups can succeed in this environment"""
+        if np is None:
+            return False
+        if self._encoder is not None:
+            return True
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, text: str) -> Optional[Any]:
+        """Return the value cached for the most similar prompt, or None on a miss"""
+        if not self.enabled or not self._values:
+            return None
+
+        embedding = self._embed(text)
+        with self._lock:
+            self._expire()
+            if self._embeddings is None:
+                return None
+            best, score = _best_match(self._embeddings, self._scales, embedding)
+            best, score = int(best), float(score)
+            value = self._values[best] if score >= self.threshold else None
+
+        if value is not None:
+            logger.info(f"Semantic cache hit (similarity {score:.3f})")
+        return value
+
+    def put(self, text: str, value: Any) -> None:
+        """Cache value under the embedding of text"""
+        if not self.enabled:
+            return
+
+        self._append(self._embed(text)[np.newaxis, :], [value])
+
+    def put_many(self, texts: Sequence[str], values: Sequence[Any]) -> None:
+        """Cache values[i] under the embedding of texts[i], embedding all texts in batches"""
+        if not self.enabled or not texts:
+            return
+        if len(texts) != len(values):
+            raise ValueError("texts and values must have the same length")
+
+        self._append(self._encode_batch(texts), list(values))
+
+    def warm(self, path: Union[str, Path]) -> int:
+        """
+        Pre-populate the cache from a JSON file of {"prompt": ..., "result": ...} entries.
+
+        Args:
+            path: JSON file holding a list of entries; each result is returned
+                as-is for prompts similar to its prompt
+
+        Returns:
+            Number of entries loaded
+        """
+        entries = orjson.loads(Path(path).read_bytes())
+        self.put_many([entry["prompt"] for entry in entries], [entry["result"] for entry in entries])
+        logger.info(f"Semantic cache warmed with {len(entries)} entries from {path}")
+        return len(entries)
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._embeddings = None
+            self._scales = None
+            self._added_at = None
+            self._values.clear()
+
+    def _append(self, embeddings, values: List[Any]) -> None:
+        """Add rows of embeddings with their values, evicting the oldest beyond max_entries"""
+        quantized, scales = _quantize(embeddings)
+        added_at = np.full(len(values), monotonic())
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings, self._scales, self._added_at = quantized, scales, added_at
+            else:
+                self._embeddings = np.vstack([self._embeddings, quantized])
+                self._scales = np.concatenate([self._scales, scales])
+                self._added_at = np.concatenate([self._added_at, added_at])
+            self._values.extend(values)
+
+            overflow = len(self._values) - self.max_entries
+            if overflow > 0:
+                self._drop_oldest(overflow)
+
+    def _expire(self) -> None:
+        """Drop entries older than the TTL; rows are in insertion order, so they form a prefix"""
+        if self._added_at is None:
+            return
+        expired = int(np.searchsorted(self._added_at, monotonic() - self.ttl, side="right"))
+        if expired:
+            self._drop_oldest(expired)
+
+    def _drop_oldest(self, count: int) -> None:
+        """Remove the first count rows (caller holds the lock)"""
+        if count >= len(self._values):
+            self._embeddings = self._scales = self._added_at = None
+            self._values.clear()
+            return
+        self._embeddings = self._embeddings[count:]
+        self._scales = self._scales[count:]
+        self._added_at = self._added_at[count:]
+        del self._values[:count]
+
+    def _load_model(self):
+        """The sentence-transformers model, loaded on first use"""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"Loading embedding model: {self.model_name}")
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _encode(self, text: str):
+        """Embed text as a unit-length float32 vector"""
+        if self._encoder is not None:
+            vector = self._encoder(text)
+        else:
+            vector = self._load_model().encode(text, normalize_embeddings=True)
+
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _encode_batch(self, texts: Sequence[str]):
+        """Embed several texts as rows of unit-length float32 vectors"""
+        if self._encoder is not None:
+            # A custom encoder takes one text at a time
+            matrix = np.stack([np.asarray(self._encoder(text), dtype=np.float32) for text in texts])
+        else:
+            matrix = np.asarray(self._load_model().encode(
+                list(texts), batch_size=SEMANTIC_CACHE_BATCH_SIZE, normalize_embeddings=True, convert_to_numpy=True
+            ), dtype=np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
@@ -5,22 +5,26 @@ This module provides a REST API endpoint that accepts natural language queries
 and returns intelligent news search results using Claude AI.
 """
 
+import asyncio
 import logging
 import uuid
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from anthropic import Anthropic
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from anthropic import Anthropic, AsyncAnthropic
+from cachetools import LRUCache
 from pathlib import Path
 
 from .models import QueryRequest, QueryResponse, HealthResponse, ErrorResponse, Article
 from ..config import get_settings, setup_logging
+from ..config.constants import SESSION_STORE_MAXSIZE, STATIC_ASSET_MAX_AGE
 from ..api_client import NewsAPIClient
-from ..intent.news_agent import NewsAgent
+from ..intent.news_agent import NewsAgent, current_turn, parse_tool_result
 
 # Setup logging
 settings = get_settings()
@@ -28,8 +32,11 @@ setup_logging(log_level=settings.log_level, log_file="logs/api_server.log")
 logger = logging.getLogger(__name__)
 
 
+# Article fields copied out of raw NewsAPI dicts when building response models
+_ARTICLE_FIELDS = tuple(Article.model_fields)
+
 # Global clients (initialized in lifespan)
-anthropic_client: Optional[Anthropic] = None
+anthropic_client: Optional[Union[Anthropic, AsyncAnthropic]] = None
 news_client: Optional[NewsAPIClient] = None
 news_agent: Optional[NewsAgent] = None
 
@@ -47,7 +54,8 @@ async def lifespan(app: FastAPI):
         if not settings.anthropic_api_key:
             logger.warning("ANTHROPIC_API_KEY not set - agent functionality will be limited")
         else:
-            anthropic_client = Anthropic(api_key=settings.anthropic_api_key)
+            anthropic_class = AsyncAnthropic if settings.agent_async else Anthropic
+            anthropic_client = anthropic_class(api_key=settings.anthropic_api_key)
             logger.info("Anthropic client initialized")
 
         if not settings.news_api_key:
@@ -58,7 +66,30 @@ async def lifespan(app: FastAPI):
 
         # Initialize agent if both clients are available
         if anthropic_client and news_client:
-            news_agent = NewsAgent(anthropic_client, news_client)
+            semantic_cache = None
+            if settings.semantic_cache_enabled:
+                from ..api_client import SemanticCache
+                semantic_cache = SemanticCache(ttl=settings.semantic_cache_ttl)
+                if not semantic_cache.enabled:
+                    logger.warning("SEMANTIC_CACHE_ENABLED is set but numpy/sentence-transformers are missing")
+                    semantic_cache = None
+                elif settings.semantic_cache_warm_file:
+                    semantic_cache.warm(settings.semantic_cache_warm_file)
+
+            if settings.redis_sessions_enabled:
+                import redis
+                from ..intent.session_store import RedisSessionStore
+                session_store = RedisSessionStore(redis.Redis.from_url(settings.redis_url), settings.session_ttl)
+            else:
+                session_store = LRUCache(maxsize=SESSION_STORE_MAXSIZE)
+
+            news_agent = NewsAgent(
+                anthropic_client,
+                news_client,
+                session_store=session_store,
+                semantic_cache=semantic_cache,
+                stream_responses=settings.agent_stream_responses
+            )
             logger.info("NewsAgent initialized")
         else:
             logger.warning("NewsAgent not initialized - missing API keys")
@@ -75,6 +106,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down API server...")
     if news_client:
         news_client.close()
+    if isinstance(anthropic_client, AsyncAnthropic):
+        await anthropic_client.close()
 
 
 # Create FastAPI app
@@ -85,31 +118,74 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add CORS middleware
+# Add CORS middleware. With a wildcard origin and credentials allowed,
+# Starlette echoes the request's Origin back, so credentialed calls still work
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly in production
-    allow_credentials=True,
+    allow_origins=settings.cors_origin_list,
+    allow_credentials=settings.cors_allow_credentials,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles for Vite's content-hashed build assets, which never change under one name."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = f"public, max-age={STATIC_ASSET_MAX_AGE}, immutable"
+        return response
+
+
+class SPAStaticFiles(StaticFiles):
+    """
+    StaticFiles that answers unknown paths with index.html.
+
+    This allows client-side routing to work properly, while API paths keep
+    returning 404 instead of the app shell. index.html is located once at
+    startup, but stat'ed on every fallback so a rebuilt frontend is served
+    with matching headers.
+    """
+
+    API_PREFIXES = ("query", "health", "docs", "openapi.json", "redoc")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        index_file = Path(self.directory) / "index.html"
+        self.index_file = index_file if index_file.is_file() else None
+
+    @classmethod
+    def _is_api_path(cls, path: str) -> bool:
+        """Whether path is an API route or below one, matched by whole segments"""
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in cls.API_PREFIXES)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if Path(full_path).name == "index.html":
+            # Revalidate the shell on each load so new deploys are picked up
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            if exc.status_code != 404 or self.index_file is None or self._is_api_path(path):
+                raise
+            try:
+                index_stat = self.index_file.stat()
+            except FileNotFoundError:
+                raise exc
+            return self.file_response(self.index_file, index_stat, scope)
+
+
 # Serve static files from web/dist directory
 static_dir = Path(__file__).parent.parent.parent / "web" / "dist"
 if static_dir.exists():
-    app.mount("/assets", StaticFiles(directory=static_dir / "assets"), name="assets")
+    app.mount("/assets", AssetStaticFiles(directory=static_dir / "assets"), name="assets")
     logger.info(f"Serving static assets from {static_dir / 'assets'}")
 
 
-@app.get("/", include_in_schema=False)
-async def serve_root():
-    """Serve the React app root."""
-    index_file = static_dir / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
-    raise HTTPException(status_code=404, detail="Frontend not built")
-
-
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Health check endpoint."""
@@ -127,7 +203,10 @@ async def health_check():
 
 
 @app.post("/query", response_model=QueryResponse, tags=["Search"])
-async def query_news(request: QueryRequest):
+async def query_news(
+    request: QueryRequest,
+    x_cache_bypass: Optional[str] = Header(None, include_in_schema=False)
+):
     """
     Process a natural language news query using AI.
 
@@ -139,6 +218,8 @@ async def query_news(request: QueryRequest):
 
     Args:
         request: Query request with natural language query and optional parameters
+        x_cache_bypass: Any non-empty X-Cache-Bypass header skips the NewsAPI response cache
+            (ignored unless settings.allow_cache_bypass is enabled)
 
     Returns:
         QueryResponse with AI response and/or structured article data
@@ -152,24 +233,43 @@ async def query_news(request: QueryRequest):
             detail="News agent not configured. Please check API keys."
         )
 
+    custom_news_client = None
     try:
         logger.info(f"Processing query: {request.query[:100]}...")
 
-        # Generate session_id if not provided
+        # Generate session_id if not provided. A request without one opens a new
+        # conversation, so the agent answers it statelessly (letting the semantic
+        # cache serve it) and the turn is stored under the new session_id afterwards
         session_id = request.session_id or str(uuid.uuid4())
 
         # Create a custom news client if user provided their own API key
-        custom_news_client = None
         if request.news_api_key:
             logger.info("Using user-provided NewsAPI key")
-            custom_news_client = NewsAPIClient(api_key=request.news_api_key)
+            custom_news_client = NewsAPIClient(api_key=request.news_api_key, cache_ttl=0)
+        elif x_cache_bypass and settings.allow_cache_bypass:
+            logger.info("Bypassing NewsAPI response cache")
+            custom_news_client = NewsAPIClient(api_key=news_client.api_key, cache_ttl=0)
+
+        # Process the request through the agent. The synchronous agent and the
+        # NewsAPI client are blocking (the client already fans query variants out
+        # on its own thread pool), so run them off the event loop to keep other
+        # requests flowing
+        if settings.agent_async:
+            result = await news_agent.aprocess_request(
+                user_prompt=request.query,
+                session_id=request.session_id,
+                custom_news_client=custom_news_client
+            )
+        else:
+            result = await asyncio.to_thread(
+                news_agent.process_request,
+                user_prompt=request.query,
+                session_id=request.session_id,
+                custom_news_client=custom_news_client
+            )
 
-        # Process the request through the agent
-        result = news_agent.process_request(
-            user_prompt=request.query,
-            session_id=session_id,
-            custom_news_client=custom_news_client
-        )
+        if request.session_id is None:
+            await asyncio.to_thread(news_agent.save_session, session_id, list(result.get("messages", [])))
 
         # Extract natural language response
         natural_response = result.get("response", "")
@@ -199,13 +299,17 @@ async def query_news(request: QueryRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing query: {str(e)}"
         )
+    finally:
+        # Per-request clients own their own HTTP session
+        if custom_news_client:
+            custom_news_client.close()
 
 
 def _extract_articles_from_messages(messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Extract article data from conversation messages.
 
-    Looks for tool results in the conversation that contain article data.
+    Looks for tool results from the latest request that contain article data.
 
     Args:
         messages: List of conversation messages
@@ -216,7 +320,7 @@ def _extract_articles_from_messages(messages: List[Dict[str, Any]]) -> Optional[
     articles = []
     total_results = 0
 
-    for message in messages:
+    for message in current_turn(messages):
         if message.get("role") != "user":
             continue
 
@@ -228,27 +332,34 @@ def _extract_articles_from_messages(messages: List[Dict[str, Any]]) -> Optional[
             if not isinstance(item, dict) or item.get("type") != "tool_result":
                 continue
 
-            # Parse the tool result content
-            import json
+            # Skip payloads that cannot contain articles without parsing them
+            tool_content = item.get("content", "")
+            if isinstance(tool_content, str) and '"articles"' not in tool_content:
+                continue
+
+            # Parse the tool result content (orjson, memoized per payload)
             try:
-                tool_content = item.get("content", "")
-                if isinstance(tool_content, str):
-                    tool_data = json.loads(tool_content)
-                else:
-                    tool_data = tool_content
+                tool_data = parse_tool_result(tool_content)
 
                 # Check if this result contains articles
                 if "articles" in tool_data:
                     articles.extend(tool_data["articles"])
                     total_results = max(total_results, tool_data.get("total_results", 0))
 
-            except (json.JSONDecodeError, Exception) as e:
+            except Exception as e:
                 logger.debug(f"Could not parse tool result: {e}")
                 continue
 
     if articles:
-        # Convert to Article models
-        article_models = [Article(**article) for article in articles]
+        # Convert to Article models. The dicts come straight from NewsAPIClient,
+        # so validation is skipped outside development
+        if settings.is_development:
+            article_models = [Article(**article) for article in articles]
+        else:
+            article_models = [
+                Article.model_construct(**{field: article[field] for field in _ARTICLE_FIELDS if field in article})
+                for article in articles
+            ]
         return {
             "articles": article_models,
             "total_results": total_results
@@ -265,7 +376,7 @@ async def http_exception_handler(request, exc):
         content=ErrorResponse(
             error=exc.detail,
             status_code=exc.status_code
-        ).dict()
+        ).model_dump()
     )
 
 
@@ -279,26 +390,14 @@ async def general_exception_handler(request, exc):
             error="Internal server error",
             detail=str(exc),
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-        ).dict()
+        ).model_dump()
     )
 
 
-@app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
-    """
-    Serve the React SPA for all non-API routes.
-    This allows client-side routing to work properly.
-    """
-    # Skip if it's an API route
-    if full_path.startswith(("query", "health", "docs", "openapi.json", "redoc")):
-        raise HTTPException(status_code=404, detail="Not found")
-
-    # Serve index.html for SPA routing
-    index_file = static_dir / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
-
-    raise HTTPException(status_code=404, detail="Frontend not built")
+# Serve the React SPA for all non-API routes. Mounted last so it only sees
+# paths no API route matched
+if static_dir.exists():
+    app.mount("/", SPAStaticFiles(directory=static_dir, html=True), name="spa")
 
 
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ Defines Pydantic models for the REST API endpoints.
 """
 
 from typing import Optional, List, Dict, Any, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class QueryRequest(BaseModel):
@@ -34,6 +34,10 @@ class QueryRequest(BaseModel):
 class Article(BaseModel):
     """Article information extracted from tool results."""
 
+    # NewsAPI articles carry fields we don't expose (e.g. content); drop them.
+    # Instances are read-only once built
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     title: Optional[str] = None
     description: Optional[str] = None
     url: Optional[str] = None
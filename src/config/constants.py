@@ -32,12 +32,17 @@ class LLMProvider(Enum):
 # HTTP Configuration
 DEFAULT_TIMEOUT_SECONDS = 30
 MAX_RETRIES = 3
-RETRY_BACKOFF_FACTOR = 2
+RETRY_BACKOFF_FACTOR = 0.2  # urllib3 Retry backoff; keeps each retry wait under a second
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+HTTP_POOL_CONNECTIONS = 20
+HTTP_POOL_MAXSIZE = 50
 
 # NewsAPI Configuration
 NEWSAPI_BASE_URL = "https://newsapi.org/v2"
 NEWSAPI_PAGE_SIZE = 100
 NEWSAPI_MAX_PAGES = 5
+NEWSAPI_MAX_CONCURRENT_REQUESTS = 10
+NEWSAPI_CACHE_MAXSIZE = 1024  # cached responses
 
 # Content Processing
 SUMMARY_MAX_LENGTH = 500  # words
@@ -54,6 +59,28 @@ SCRAPING_REQUESTS_PER_SECOND = 1
 # Cache TTL (seconds)
 ARTICLE_CACHE_TTL = 3600  # 1 hour
 METADATA_CACHE_TTL = 300  # 5 minutes
+STATIC_ASSET_MAX_AGE = 31536000  # 1 year; build assets are content-hashed
+QUERY_OPTIMIZATION_CACHE_TTL = 3600  # 1 hour
+QUERY_OPTIMIZATION_CACHE_MAXSIZE = 1024
+
+# Semantic Cache (optional; needs numpy + sentence-transformers)
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.95  # cosine similarity
+SEMANTIC_CACHE_MAX_ENTRIES = 1024
+SEMANTIC_CACHE_TTL_SECONDS = 300  # cached answers describe "latest" news, so they go stale quickly
+SEMANTIC_CACHE_BATCH_SIZE = 64  # prompts embedded per batch when warming the cache
+
+# Agent Sessions
+SESSION_STORE_MAXSIZE = 1024  # conversations kept in memory per server process
+SESSION_KEY_PREFIX = "conv:"  # Redis key prefix when sessions are stored in Redis
+SESSION_HISTORY_MAX_TOKENS = 16000  # estimated; older turns are dropped beyond this
+TOOL_EXECUTION_WORKERS = 4  # max concurrent tool calls per Claude response; each response gets its own pool
+TOOL_RESULT_CACHE_MAXSIZE = 256  # per tool
+TOOL_RESULT_CACHE_TTLS = {  # seconds; optimize_queries is cached by QueryOptimizer itself
+    "search_everything": 120,
+    "search_top_headlines": 60,  # breaking news moves fastest
+    "get_sources": 86400,  # source lists rarely change
+}
 
 # Batch Processing
 DEFAULT_BATCH_SIZE = 10
@@ -4,34 +4,54 @@ Logging configuration for the application.
 
 import logging
 import sys
-from typing import Optional
+from typing import ClassVar, Dict, List, Optional, Tuple
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 
+# Configuration applied by the last setup_logging call and the handlers it added
+_active_config: Optional[Tuple] = None
+_active_handlers: List[logging.Handler] = []
+
+
 def setup_logging(
     log_level: str = "INFO",
     log_file: Optional[str] = None,
     max_bytes: int = 10485760,  # 10MB
-    backup_count: int = 5
+    backup_count: int = 5,
+    force: bool = False
 ) -> logging.Logger:
     """
     Configure application logging.
 
+    Calling it again with the same arguments is a no-op while the handlers it
+    installed are still attached.
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional file path for log output
         max_bytes: Maximum size of log file before rotation
         backup_count: Number of backup log files to keep
+        force: Rebuild the handlers even if this configuration is already active
 
     Returns:
         logging.Logger: Configured root logger
     """
+    global _active_config, _active_handlers
+
     # Get root logger
     logger = logging.getLogger()
+
+    config = (log_level.upper(), log_file, max_bytes, backup_count)
+    if (not force and config == _active_config and _active_handlers
+            and all(handler in logger.handlers for handler in _active_handlers)):
+        return logger
+
     logger.setLevel(getattr(logging, log_level.upper()))
 
-    # Clear any existing handlers
+    # Clear any existing handlers, closing the files of those installed here
+    for handler in _active_handlers:
+        handler.close()
     logger.handlers.clear()
 
     # Create formatter
@@ -49,7 +69,8 @@ def setup_logging(
     # File handler (if specified)
     if log_file:
         log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        if not log_path.parent.is_dir():
+            log_path.parent.mkdir(parents=True, exist_ok=True)
 
         file_handler = RotatingFileHandler(
             log_file,
@@ -67,6 +88,8 @@ def setup_logging(
     logging.getLogger("azure").setLevel(logging.WARNING)
     logging.getLogger("openai").setLevel(logging.WARNING)
 
+    _active_config = config
+    _active_handlers = list(logger.handlers)
     return logger
 
 
@@ -86,7 +109,15 @@ def get_logger(name: str) -> logging.Logger:
 class LoggerMixin:
     """Mixin class to add logging capability to any class."""
 
+    # One logger per concrete class, resolved on first access
+    _logger_cache: ClassVar[Dict[type, logging.Logger]] = {}
+
     @property
     def logger(self) -> logging.Logger:
         """Get logger instance for this class."""
-        return get_logger(self.__class__.__module__ + "." + self.__class__.__name__)
+        cls = type(self)
+        logger = LoggerMixin._logger_cache.get(cls)
+        if logger is None:
+            logger = get_logger(f"{cls.__module__}.{cls.__qualname__}")
+            LoggerMixin._logger_cache[cls] = logger
+        return logger
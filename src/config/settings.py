@@ -4,9 +4,10 @@ Application settings and configuration management.
 Loads configuration from environment variables using pydantic-settings.
 """
 
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from pathlib import Path
-from pydantic import Field, validator
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
@@ -100,12 +101,59 @@ class Settings(BaseSettings):
         le=1000,
         description="Maximum number of articles to fetch per search"
     )
+    newsapi_cache_ttl: int = Field(
+        default=3600,
+        ge=0,
+        description="Seconds a NewsAPI response is reused for identical requests (0 disables the cache)"
+    )
+    allow_cache_bypass: bool = Field(
+        default=False,
+        description="Honour the X-Cache-Bypass request header (uncached requests spend NewsAPI quota; keep off in production)"
+    )
+    semantic_cache_enabled: bool = Field(
+        default=False,
+        description="Answer paraphrased prompts that open a conversation from an embedding cache (needs sentence-transformers)"
+    )
+    semantic_cache_ttl: int = Field(
+        default=300,
+        ge=1,
+        description="Seconds a semantically cached answer is served before it is considered stale"
+    )
+    semantic_cache_warm_file: Optional[str] = Field(
+        default=None,
+        description="JSON file of {prompt, result} entries loaded into the semantic cache at startup"
+    )
+    agent_stream_responses: bool = Field(
+        default=False,
+        description="Stream Claude responses so tool calls start while generation continues"
+    )
+    agent_async: bool = Field(
+        default=False,
+        description="Use the async Anthropic client so Claude calls do not hold a worker thread"
+    )
+    redis_sessions_enabled: bool = Field(
+        default=False,
+        description="Keep conversation history in Redis (REDIS_URL) so every worker can serve a session"
+    )
+    session_ttl: int = Field(
+        default=3600,
+        ge=1,
+        description="Seconds an idle session is kept in Redis"
+    )
     app_env: str = Field(default="development", description="Application environment")
     log_level: str = Field(default="INFO", description="Logging level")
 
     # Web Application Settings
     host: str = Field(default="0.0.0.0", description="Host to bind the web server")
     port: int = Field(default=8000, ge=1, le=65535, description="Port to bind the web server")
+    cors_origins: str = Field(
+        default="*",
+        description="Comma-separated origins allowed to call the API, or * for any origin"
+    )
+    cors_allow_credentials: bool = Field(
+        default=True,
+        description="Allow credentialed cross-origin requests (cookies, Authorization headers)"
+    )
 
     # Redis and Celery Configuration
     redis_url: str = Field(
@@ -131,8 +179,9 @@ class Settings(BaseSettings):
         description="Sentry traces sample rate for performance monitoring (0.0 to 1.0)"
     )
 
-    @validator("log_level")
-    def validate_log_level(cls, v):
+    @field_validator("log_level")
+    @classmethod
+    def validate_log_level(cls, v: str) -> str:
         """Ensure log level is valid."""
         valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
         v_upper = v.upper()
@@ -140,13 +189,18 @@ class Settings(BaseSettings):
             raise ValueError(f"log_level must be one of {valid_levels}")
         return v_upper
 
-    @validator("azure_openai_key", "anthropic_api_key")
-    def validate_llm_config(cls, v, values):
-        """Ensure at least one LLM API key is provided."""
-        # This validator runs for each field, so we check if ANY is set
-        if not v and "anthropic_api_key" not in values and "azure_openai_key" not in values:
-            return v
-        return v
+    @classmethod
+    def from_overrides(cls, **overrides) -> "Settings":
+        """
+        Build settings with the given field values, ignoring the .env file.
+
+        Overrides take precedence over environment variables, so callers (mainly
+        tests) need not modify os.environ. Values are validated as usual.
+
+        Args:
+            **overrides: Field values keyed by field name (e.g. port=8500)
+        """
+        return cls(_env_file=None, **overrides)
 
     @property
     def is_development(self) -> bool:
@@ -168,16 +222,18 @@ class Settings(BaseSettings):
         """Check if Azure OpenAI is configured."""
         return self.azure_openai_key is not None and self.azure_openai_endpoint is not None
 
+    @property
+    def cors_origin_list(self) -> List[str]:
+        """Allowed CORS origins as a list."""
+        return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
+
     @property
     def should_use_mcp(self) -> bool:
         """Check if MCP should be used (based on USE_MCP setting and development mode)."""
         return self.use_mcp
 
 
-# Global settings instance
-settings: Optional[Settings] = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Get or create the global settings instance.
@@ -185,10 +241,7 @@ def get_settings() -> Settings:
     Returns:
         Settings: The application settings
     """
-    global settings
-    if settings is None:
-        settings = Settings()
-    return settings
+    return Settings()
 
 
 def reload_settings() -> Settings:
@@ -198,6 +251,5 @@ def reload_settings() -> Settings:
     Returns:
         Settings: The newly loaded settings
     """
-    global settings
-    settings = Settings()
-    return settings
+    get_settings.cache_clear()
+    return get_settings()
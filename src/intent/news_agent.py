@@ -5,150 +5,319 @@ This module provides an intelligent agent that uses Anthropic's Claude
 to process natural language queries and execute news searches.
 """
 
-import json
-from typing import Dict, Any
-from dataclasses import asdict
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, MutableMapping, Optional
+
+import orjson
+from cachetools import TTLCache
 
 from ..api_client.query_optimizer import QueryOptimizer
 from ..api_client.models import UserQuery
+from ..config.constants import (
+    SESSION_HISTORY_MAX_TOKENS,
+    TOOL_EXECUTION_WORKERS,
+    TOOL_RESULT_CACHE_MAXSIZE,
+    TOOL_RESULT_CACHE_TTLS,
+)
 
+if TYPE_CHECKING:
+    from ..api_client.semantic_cache import SemanticCache
 
-class NewsAgent:
-    """AI-driven news search agent using Anthropic tool use"""
 
-    def __init__(self, anthropic_client, news_api_client):
-        self.client = anthropic_client
-        self.news_client = news_api_client
-        self.conversation_history = {}
-        # Define available tools
-        self.tools = [
-            {
-                "name": "optimize_queries",
-                "description": "Generate optimized search queries from natural language input. Use this when the user provides semantic/natural language requests that need to be converted into structured search parameters.",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "user_input": {
-                            "type": "string",
-                            "description": "The natural language search request from the user"
-                        }
-                    },
-                    "required": ["user_input"]
+@lru_cache(maxsize=256)
+def _load_tool_result(content: str) -> Any:
+    return orjson.loads(content)
+
+
+def parse_tool_result(content: Any) -> Any:
+    """
+    Decode the JSON payload of a tool_result content block.
+
+    Parsed payloads are memoized by their text, so re-scanning a session's
+    history on every request does not re-parse earlier turns. The returned
+    object is shared between callers and must not be mutated.
+
+    Args:
+        content: tool_result content (JSON string or already-decoded object)
+
+    Returns:
+        Decoded tool result
+    """
+    if isinstance(content, str):
+        return _load_tool_result(content)
+    return content
+
+
+def current_turn(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Return the messages belonging to the most recent request.
+
+    A session's history also holds every earlier request. Each request starts
+    with a user message carrying the plain prompt, whereas tool results come
+    back as lists of content blocks, so the history is scanned backwards to
+    that prompt instead of forwards from the start of the session.
+
+    Args:
+        messages: Conversation history
+
+    Returns:
+        Messages from the latest user prompt onwards
+    """
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        if message.get("role") == "user" and not isinstance(message.get("content"), list):
+            return messages[index:]
+    return messages
+
+
+# Article fields passed back to Claude (and on to API responses). NewsAPI's
+# `content` snippet is the bulkiest field and is not exposed anywhere, so it
+# is left out of tool results
+_TOOL_ARTICLE_FIELDS = ("source", "author", "title", "description", "url", "urlToImage", "publishedAt")
+
+
+def _slim_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: article[field] for field in _TOOL_ARTICLE_FIELDS if field in article}
+
+
+def _estimate_tokens(message: Dict[str, Any]) -> int:
+    """Rough token count of a message, at about four characters per token."""
+    content = message.get("content")
+    if isinstance(content, str):
+        return len(content) // 4
+
+    chars = 0
+    for block in content or ():
+        if isinstance(block, dict):
+            # Tool results, and assistant blocks once a session store has
+            # serialized them (e.g. RedisSessionStore)
+            fields = (block.get("content", ""), block.get("text", ""), block.get("input", ""))
+        else:
+            # Assistant blocks as returned by the SDK: text and/or tool_use input
+            fields = (getattr(block, "text", ""), getattr(block, "input", ""))
+        chars += sum(len(str(field)) for field in fields)
+    return chars // 4
+
+
+def _trim_history(messages: List[Dict[str, Any]], max_tokens: int) -> None:
+    """
+    Drop the oldest turns of a session history until it fits max_tokens.
+
+    Whole turns (a user prompt through the final answer) are removed so that
+    tool_use / tool_result pairs are never split. The most recent turn is
+    always kept. Trims in place.
+    """
+    sizes = [_estimate_tokens(message) for message in messages]
+    total = sum(sizes)
+    if total <= max_tokens:
+        return
+
+    turn_starts = [
+        index for index, message in enumerate(messages)
+        if message.get("role") == "user" and not isinstance(message.get("content"), list)
+    ]
+    cut = 0
+    for start in turn_starts[1:]:
+        if total <= max_tokens:
+            break
+        total -= sum(sizes[cut:start])
+        cut = start
+    del messages[:cut]
+
+
+def _with_cache_breakpoint(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Mark the latest tool results as a prompt-cache breakpoint.
+
+    Within a tool loop each call resends the previous one's prompt plus the new
+    tool results, so caching up to those results makes the next call a cache
+    hit. The marker goes on copies: the stored history must not accumulate
+    breakpoints, as the API accepts only four per request. A plain user prompt
+    is left unmarked.
+    """
+    last = messages[-1] if messages else None
+    if not last or last.get("role") != "user" or not isinstance(last.get("content"), list) or not last["content"]:
+        return messages
+
+    content = list(last["content"])
+    content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+    return messages[:-1] + [{**last, "content": content}]
+
+
+# Tool definitions, shared by every agent (do not mutate). The definitions are
+# identical on every call; marking the last one lets Anthropic cache the whole
+# tools block as a prompt prefix
+TOOLS = (
+    {
+        "name": "optimize_queries",
+        "description": "Generate optimized search queries from natural language input. Use this when the user provides semantic/natural language requests that need to be converted into structured search parameters.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "user_input": {
+                    "type": "string",
+                    "description": "The natural language search request from the user"
                 }
             },
-            {
-                "name": "search_everything",
-                "description": "Search historical news articles using the /everything endpoint. Supports full-text search with date ranges, language filters, domains, etc. Use this for your searches.",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "q": {
-                            "type": "string",
-                            "description": "Search query (required)"
-                        },
-                        "searchIn": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Where to search: title, description, content"
-                        },
-                        "sources": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "News source IDs to include"
-                        },
-                        "domains": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Domains to include (e.g., bbc.co.uk)"
-                        },
-                        "excludeDomains": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Domains to exclude"
-                        },
-                        "from_date": {
-                            "type": "string",
-                            "description": "Start date in ISO format"
-                        },
-                        "to_date": {
-                            "type": "string",
-                            "description": "End date in ISO format"
-                        },
-                        "languages": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "ISO-639-1 language codes"
-                        },
-                        "sortBy": {
-                            "type": "string",
-                            "enum": ["relevancy", "popularity", "publishedAt"],
-                            "description": "Sort order"
-                        },
-                        "max_results": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return"
-                        }
-                    },
-                    "required": ["q"]
+            "required": ["user_input"]
+        }
+    },
+    {
+        "name": "search_everything",
+        "description": "Search historical news articles using the /everything endpoint. Supports full-text search with date ranges, language filters, domains, etc. Use this for your searches.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "q": {
+                    "type": "string",
+                    "description": "Search query (required)"
+                },
+                "searchIn": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Where to search: title, description, content"
+                },
+                "sources": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "News source IDs to include"
+                },
+                "domains": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Domains to include (e.g., bbc.co.uk)"
+                },
+                "excludeDomains": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Domains to exclude"
+                },
+                "from_date": {
+                    "type": "string",
+                    "description": "Start date in ISO format"
+                },
+                "to_date": {
+                    "type": "string",
+                    "description": "End date in ISO format"
+                },
+                "languages": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "ISO-639-1 language codes"
+                },
+                "sortBy": {
+                    "type": "string",
+                    "enum": ["relevancy", "popularity", "publishedAt"],
+                    "description": "Sort order"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return"
                 }
             },
-            {
-                "name": "search_top_headlines",
-                "description": "Get current top headlines using the /top-headlines endpoint. Use this for breaking news and current events.",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "q": {
-                            "type": "string",
-                            "description": "Search query (optional)"
-                        },
-                        "countries": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "ISO 3166-1 alpha-2 country codes"
-                        },
-                        "categories": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Categories: business, entertainment, general, health, science, sports, technology"
-                        },
-                        "sources": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "News source IDs"
-                        },
-                        "max_results": {
-                            "type": "integer",
-                            "description": "Maximum number of results"
-                        }
-                    }
+            "required": ["q"]
+        }
+    },
+    {
+        "name": "search_top_headlines",
+        "description": "Get current top headlines using the /top-headlines endpoint. Use this for breaking news and current events.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "q": {
+                    "type": "string",
+                    "description": "Search query (optional)"
+                },
+                "countries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "ISO 3166-1 alpha-2 country codes"
+                },
+                "categories": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Categories: business, entertainment, general, health, science, sports, technology"
+                },
+                "sources": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "News source IDs"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results"
                 }
-            },
-            {
-                "name": "get_sources",
-                "description": "Get available news sources. Use this when users want to know what sources are available, or to filter sources by category/language/country.",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "categories": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Filter by categories"
-                        },
-                        "languages": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Filter by languages"
-                        },
-                        "countries": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Filter by countries"
-                        }
-                    }
+            }
+        }
+    },
+    {
+        "name": "get_sources",
+        "description": "Get available news sources. Use this when users want to know what sources are available, or to filter sources by category/language/country.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "categories": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Filter by categories"
+                },
+                "languages": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Filter by languages"
+                },
+                "countries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Filter by countries"
                 }
             }
-        ]
+        },
+        "cache_control": {"type": "ephemeral"}
+    }
+)
+
+
+class NewsAgent:
+    """AI-driven news search agent using Anthropic tool use"""
+
+    def __init__(
+        self,
+        anthropic_client,
+        news_api_client,
+        session_store: Optional[MutableMapping[str, List[Dict[str, Any]]]] = None,
+        semantic_cache: Optional['SemanticCache'] = None,
+        stream_responses: bool = False
+    ):
+        self.client = anthropic_client
+        self.news_client = news_api_client
+        # Stream Claude's responses so tool calls start before generation ends
+        self.stream_responses = stream_responses
+        # Answers paraphrases of earlier opening prompts without calling Claude
+        self.semantic_cache = semantic_cache
+        # Message history per session_id. Long-running servers should pass a
+        # bounded mapping (e.g. cachetools.LRUCache) so idle sessions are evicted,
+        # or a RedisSessionStore to share sessions between workers
+        self.conversation_history = session_store if session_store is not None else {}
+        self._history_lock = threading.Lock()
+        # Recent tool results, serialized, per cacheable tool
+        self._tool_caches = {
+            name: TTLCache(maxsize=TOOL_RESULT_CACHE_MAXSIZE, ttl=ttl)
+            for name, ttl in TOOL_RESULT_CACHE_TTLS.items()
+        }
+        self._tool_cache_lock = threading.Lock()
+        self.tools = TOOLS
+
+        # Tool name -> handler(tool_input, news_client)
+        self._tool_handlers = {
+            "optimize_queries": self._optimize_queries,
+            "search_everything": self._search_everything,
+            "search_top_headlines": self._search_top_headlines,
+            "get_sources": self._get_sources,
+        }
 
     def process_request(self, user_prompt: str, session_id: str = None, custom_news_client=None) -> Dict[str, Any]:
         """
@@ -167,80 +336,283 @@ class NewsAgent:
         """
         # Use custom news client if provided, otherwise use default
         active_news_client = custom_news_client if custom_news_client else self.news_client
+        semantic_cache = self._semantic_cache_for(session_id, custom_news_client)
+        cacheable = custom_news_client is None
 
-        if session_id:
-            # Get or create conversation history for this session
-            if session_id not in self.conversation_history:
-                self.conversation_history[session_id] = []
-            messages = self.conversation_history[session_id]
-            messages.append({
-                "role": "user",
-                "content": user_prompt
-            })
-        else:
-            messages = [{"role": "user", "content": user_prompt}]
+        cached = self._cached_answer(user_prompt, semantic_cache)
+        if cached is not None:
+            return cached
+
+        messages = self._load_session(session_id)
+        messages.append({
+            "role": "user",
+            "content": user_prompt
+        })
 
         # Collect all intermediate responses
         intermediate_responses = []
 
         # Keep calling tools until AI is done
         while True:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=4096,
-                tools=self.tools,
-                messages=messages
-            )
-
-            # Extract any text from this response (even if it also uses tools)
-            response_text = ""
-            for block in response.content:
-                if hasattr(block, "text"):
-                    response_text += block.text
-
-            # If there's text, save it as an intermediate response
-            if response_text.strip():
-                intermediate_responses.append(response_text)
-
-            # Check if AI wants to use tools
-            if response.stop_reason == "tool_use":
-                # Process each tool call
-                tool_results = []
-                for content_block in response.content:
-                    if content_block.type == "tool_use":
-                        tool_name = content_block.name
-                        tool_input = content_block.input
+            # Tool calls run on this response's own pool as soon as their blocks
+            # are complete; when streaming, that is while Claude is still
+            # generating the rest. The pool only starts threads as calls arrive
+            tool_futures = []
+            with ThreadPoolExecutor(max_workers=TOOL_EXECUTION_WORKERS) as tool_pool:
 
-                        # Execute the tool
-                        result = self._execute_tool(tool_name, tool_input, active_news_client)
+                def start_tool(block):
+                    tool_futures.append(tool_pool.submit(
+                        self._tool_result_content, block.name, block.input, active_news_client, cacheable
+                    ))
 
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": content_block.id,
-                            "content": json.dumps(result)
-                        })
+                response = self._create_message(messages, start_tool if self.stream_responses else None)
+                tool_blocks = self._collect_content(response, intermediate_responses)
 
-                # Add assistant response and tool results to conversation
-                messages.append({"role": "assistant", "content": response.content})
-                messages.append({"role": "user", "content": tool_results})
+                # Check if AI wants to use tools
+                if response.stop_reason == "tool_use":
+                    # Execute every tool call concurrently (reusing recent identical
+                    # calls when possible), then collect results in block order.
+                    # A lone call that has not started yet runs inline
+                    if len(tool_blocks) == 1 and not tool_futures:
+                        block = tool_blocks[0]
+                        contents = [self._tool_result_content(block.name, block.input, active_news_client, cacheable)]
+                    else:
+                        for block in tool_blocks[len(tool_futures):]:
+                            start_tool(block)
+                        contents = [future.result() for future in tool_futures]
 
-                # Continue the loop to get Claude's response to the tool results
+                    self._append_tool_results(messages, response, tool_blocks, contents)
+                    # Continue the loop to get Claude's response to the tool results
 
             # AI is done, return all responses
+            if response.stop_reason == "end_turn":
+                return self._finish_turn(
+                    user_prompt, session_id, messages, response, intermediate_responses, semantic_cache
+                )
+
+    async def aprocess_request(self, user_prompt: str, session_id: str = None, custom_news_client=None) -> Dict[str, Any]:
+        """
+        Awaitable process_request for agents built with an AsyncAnthropic client.
+
+        Claude calls no longer hold a thread while waiting for a response. The
+        NewsAPI client is blocking, so tool calls still run in worker threads,
+        all calls from one response at once.
+
+        Args:
+            user_prompt: Natural language query from the user
+            session_id: Optional session ID to maintain conversation context
+            custom_news_client: Optional NewsAPIClient with custom API key
+        """
+        active_news_client = custom_news_client if custom_news_client else self.news_client
+        semantic_cache = self._semantic_cache_for(session_id, custom_news_client)
+        cacheable = custom_news_client is None
+
+        # Embedding the prompt and session store calls (Redis) block, so they
+        # run in worker threads to keep the event loop free
+        cached = await asyncio.to_thread(self._cached_answer, user_prompt, semantic_cache)
+        if cached is not None:
+            return cached
+
+        messages = await asyncio.to_thread(self._load_session, session_id)
+        messages.append({"role": "user", "content": user_prompt})
+        intermediate_responses = []
+
+        while True:
+            tool_tasks = []
+
+            def start_tool(block):
+                tool_tasks.append(asyncio.ensure_future(asyncio.to_thread(
+                    self._tool_result_content, block.name, block.input, active_news_client, cacheable
+                )))
+
+            response = await self._acreate_message(messages, start_tool if self.stream_responses else None)
+            tool_blocks = self._collect_content(response, intermediate_responses)
+
+            if response.stop_reason == "tool_use":
+                for block in tool_blocks[len(tool_tasks):]:
+                    start_tool(block)
+                contents = await asyncio.gather(*tool_tasks)
+                self._append_tool_results(messages, response, tool_blocks, contents)
+
             elif response.stop_reason == "end_turn":
-                # Combine all intermediate responses
-                final_response = "\n\n".join(intermediate_responses) if intermediate_responses else ""
-
-                # Add final assistant response to conversation history
-                messages.append({"role": "assistant", "content": response.content})
-                # Note: if session_id is provided, messages is already a reference
-                # to self.conversation_history[session_id], so it's automatically saved
-
-                return {
-                    "response": final_response,
-                    "intermediate_responses": intermediate_responses,
-                    "messages": messages  # Full conversation history
-                }
+                return await asyncio.to_thread(
+                    self._finish_turn,
+                    user_prompt, session_id, messages, response, intermediate_responses, semantic_cache
+                )
+
+    def _load_session(self, session_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Return the session's message list (a new one when there is no session)"""
+        if not session_id:
+            return []
+        # Bounded stores reorder on every lookup, so access is serialized across
+        # requests. The turn works on its own copy of the history: concurrent
+        # requests for one session must not interleave their tool_use/tool_result
+        # pairs in a shared list. The copy is written back by save_session
+        with self._history_lock:
+            messages = list(self.conversation_history.get(session_id) or ())
+        # Every request resends the history, so cap how much of it is kept
+        _trim_history(messages, SESSION_HISTORY_MAX_TOKENS)
+        return messages
+
+    def _semantic_cache_for(self, session_id: Optional[str], custom_news_client) -> Optional['SemanticCache']:
+        """
+        The semantic cache, if this request may be answered from and stored in it.
+
+        Only stateless requests (no session_id) use it: an answer then depends on
+        the prompt alone, and cached turns never become part of another session's
+        history. Results fetched with someone else's API key are neither served
+        nor stored.
+        """
+        if session_id or custom_news_client:
+            return None
+        return self.semantic_cache
+
+    @staticmethod
+    def _cached_answer(user_prompt: str, semantic_cache: Optional['SemanticCache']) -> Optional[Dict[str, Any]]:
+        """Answer the prompt from the semantic cache, if possible"""
+        if semantic_cache is None:
+            return None
+        cached = semantic_cache.get(user_prompt)
+        if cached is None:
+            return None
+        # The cached turn opened with the prompt it was stored under
+        return {**cached, "messages": [{"role": "user", "content": user_prompt}, *cached["messages"][1:]]}
+
+    @staticmethod
+    def _collect_content(response, intermediate_responses: List[str]) -> List[Any]:
+        """
+        Save any text from a response (even one that also uses tools).
+
+        Returns:
+            The response's tool_use blocks, found in the same pass
+        """
+        text_parts, tool_blocks = [], []
+        for block in response.content:
+            if block.type == "text":
+                text_parts.append(block.text)
+            elif block.type == "tool_use":
+                tool_blocks.append(block)
+        response_text = "".join(text_parts)
+        if response_text.strip():
+            intermediate_responses.append(response_text)
+        return tool_blocks
+
+    @staticmethod
+    def _append_tool_results(messages: List[Dict[str, Any]], response, tool_blocks, contents) -> None:
+        """Add the assistant's tool calls and their results to the conversation"""
+        tool_results = [
+            {
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "content": content
+            }
+            for block, content in zip(tool_blocks, contents)
+        ]
+        messages.append({"role": "assistant", "content": response.content})
+        messages.append({"role": "user", "content": tool_results})
+
+    def _finish_turn(self, user_prompt: str, session_id: Optional[str], messages: List[Dict[str, Any]], response,
+                     intermediate_responses: List[str], semantic_cache: Optional['SemanticCache']) -> Dict[str, Any]:
+        """
+        Record Claude's final response and build the request result.
+
+        Args:
+            semantic_cache: Cache to store the answer in, only passed for stateless requests
+        """
+        # Combine all intermediate responses
+        final_response = "\n\n".join(intermediate_responses) if intermediate_responses else ""
+
+        # Add final assistant response to conversation history
+        messages.append({"role": "assistant", "content": response.content})
+        self.save_session(session_id, messages)
+
+        result = {
+            "response": final_response,
+            "intermediate_responses": intermediate_responses,
+            "messages": messages  # Full conversation history
+        }
+        if semantic_cache is not None:
+            # Snapshot the turn; the session list keeps growing
+            semantic_cache.put(user_prompt, {**result, "messages": list(messages)})
+        return result
+
+    def save_session(self, session_id: Optional[str], messages: List[Dict[str, Any]]) -> None:
+        """
+        Store a session's messages once its request has finished.
+
+        Each request works on a copy of the history, so this write is what
+        records the turn. When two requests for one session overlap, the one
+        that finishes last wins and the history stays consistent. Callers can
+        also use it to start a session from the messages of a stateless request.
+        """
+        if session_id:
+            with self._history_lock:
+                self.conversation_history[session_id] = messages
+
+    def _message_request(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Arguments for a Messages API call continuing the conversation"""
+        return {
+            "model": "claude-sonnet-4-5-20250929",
+            "max_tokens": 4096,
+            "tools": self.tools,
+            "messages": _with_cache_breakpoint(messages)
+        }
+
+    def _create_message(self, messages: List[Dict[str, Any]], on_tool_use=None):
+        """
+        Send the conversation to Claude and return the complete response message.
+
+        Args:
+            messages: Conversation so far
+            on_tool_use: If given, the response is streamed and this is called with
+                each tool_use block as soon as that block is complete
+        """
+        request = self._message_request(messages)
+        if on_tool_use is None:
+            return self.client.messages.create(**request)
+
+        with self.client.messages.stream(**request) as stream:
+            for event in stream:
+                if event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    on_tool_use(event.content_block)
+            return stream.get_final_message()
+
+    async def _acreate_message(self, messages: List[Dict[str, Any]], on_tool_use=None):
+        """_create_message for an AsyncAnthropic client"""
+        request = self._message_request(messages)
+        if on_tool_use is None:
+            return await self.client.messages.create(**request)
+
+        async with self.client.messages.stream(**request) as stream:
+            async for event in stream:
+                if event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    on_tool_use(event.content_block)
+            return await stream.get_final_message()
+
+    def _tool_result_content(self, tool_name: str, tool_input: Dict[str, Any], news_client=None, cacheable: bool = True) -> str:
+        """
+        Execute a tool and return its result serialized for a tool_result block.
+
+        Claude often repeats a tool call within or across sessions, so successful
+        results are kept briefly per tool (see TOOL_RESULT_CACHE_TTLS) and reused
+        for identical inputs.
+        """
+        cache = self._tool_caches.get(tool_name) if cacheable else None
+        if cache is None:
+            return orjson.dumps(self._execute_tool(tool_name, tool_input, news_client)).decode()
+
+        key = orjson.dumps(tool_input, option=orjson.OPT_SORT_KEYS)
+        with self._tool_cache_lock:
+            content = cache.get(key)
+        if content is not None:
+            return content
+
+        result = self._execute_tool(tool_name, tool_input, news_client)
+        content = orjson.dumps(result).decode()
+        if result.get("status", "ok") == "ok":
+            with self._tool_cache_lock:
+                cache[key] = content
+        return content
 
     def _execute_tool(self, tool_name: str, tool_input: Dict[str, Any], news_client=None) -> Dict[str, Any]:
         """
@@ -251,43 +623,45 @@ class NewsAgent:
             tool_input: Input parameters for the tool
             news_client: NewsAPIClient to use (defaults to self.news_client)
         """
+        handler = self._tool_handlers.get(tool_name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {tool_name}")
+
         # Use provided client or fall back to default
         client = news_client if news_client else self.news_client
+        return handler(tool_input, client)
 
-        if tool_name == "optimize_queries":
-            optimizer = QueryOptimizer()
-            queries = optimizer.optimize_query(tool_input["user_input"])
-            return {
-                "queries": [asdict(q) for q in queries]
-            }
+    def _optimize_queries(self, tool_input: Dict[str, Any], client) -> Dict[str, Any]:
+        optimizer = QueryOptimizer()
+        queries = optimizer.optimize_query(tool_input["user_input"])
+        return {
+            "queries": [q.to_dict() for q in queries]
+        }
 
-        elif tool_name == "search_everything":
-            # Create UserQuery from tool input
-            query = UserQuery(**tool_input)
-            result = client.search_everything(query)
-            return {
-                "status": result["status"],
-                "total_results": result["totalResults"],
-                "articles": result["articles"][:10]  # Limit for context
-            }
+    def _search_everything(self, tool_input: Dict[str, Any], client) -> Dict[str, Any]:
+        # Create UserQuery from tool input
+        query = UserQuery(**tool_input)
+        result = client.search_everything(query)
+        return {
+            "status": result["status"],
+            "total_results": result["totalResults"],
+            "articles": [_slim_article(a) for a in result["articles"][:10]]  # Limit for context
+        }
 
-        elif tool_name == "search_top_headlines":
-            query = UserQuery(**tool_input)
-            result = client.search_top_headlines(query)
-            return {
-                "status": result["status"],
-                "total_results": result["totalResults"],
-                "articles": result["articles"][:10]
-            }
+    def _search_top_headlines(self, tool_input: Dict[str, Any], client) -> Dict[str, Any]:
+        query = UserQuery(**tool_input)
+        result = client.search_top_headlines(query)
+        return {
+            "status": result["status"],
+            "total_results": result["totalResults"],
+            "articles": [_slim_article(a) for a in result["articles"][:10]]
+        }
 
-        elif tool_name == "get_sources":
-            query = UserQuery(**tool_input)
-            result = client.get_sources(query)
-            return {
-                "status": result["status"],
-                "sources": result["sources"]
-            }
-
-        else:
-            raise ValueError(f"Unknown tool: {tool_name}")
+    def _get_sources(self, tool_input: Dict[str, Any], client) -> Dict[str, Any]:
+        query = UserQuery(**tool_input)
+        result = client.get_sources(query)
+        return {
+            "status": result["status"],
+            "sources": result["sources"]
+        }
 
@@ -0,0 +1,64 @@
+"""
+Redis-backed conversation history shared across server workers.
+
+NewsAgent keeps each session's messages in a mapping. The default in-process
+mapping ties a session to whichever worker first served it; RedisSessionStore
+keeps the history in Redis instead, so any worker can continue a session and
+idle sessions expire after a TTL rather than accumulating in memory.
+
+Optional: requires the redis package (only the client object is used here, so
+any redis.Redis-compatible client works).
+"""
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List
+
+import orjson
+
+from ..config.constants import SESSION_KEY_PREFIX
+
+
+def _encode_block(obj: Any) -> Any:
+    """Serialize Anthropic content blocks (pydantic models) the way the SDK sends them"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json", exclude_unset=True)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class RedisSessionStore(MutableMapping):
+    """
+    Mapping of session_id to message list stored in Redis with a TTL.
+
+    Lists are copied in and out, so NewsAgent writes a session back once its
+    request finishes; every write refreshes the session's TTL.
+    """
+
+    def __init__(self, redis_client, ttl: int):
+        self.redis = redis_client
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"{SESSION_KEY_PREFIX}{session_id}"
+
+    def __getitem__(self, session_id: str) -> List[Dict[str, Any]]:
+        data = self.redis.get(self._key(session_id))
+        if data is None:
+            raise KeyError(session_id)
+        return orjson.loads(data)
+
+    def __setitem__(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        self.redis.setex(self._key(session_id), self.ttl, orjson.dumps(messages, default=_encode_block))
+
+    def __delitem__(self, session_id: str) -> None:
+        if not self.redis.delete(self._key(session_id)):
+            raise KeyError(session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        prefix_length = len(SESSION_KEY_PREFIX)
+        for key in self.redis.scan_iter(match=f"{SESSION_KEY_PREFIX}*"):
+            if isinstance(key, bytes):
+                key = key.decode()
+            yield key[prefix_length:]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
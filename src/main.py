@@ -50,8 +50,10 @@ async def main() -> None:
                 news_api_client=news_client
             )
 
-            # Process the query
-            result = news_agent.process_request(
+            # Process the query off the event loop; the agent's Anthropic and
+            # NewsAPI calls are blocking
+            result = await asyncio.to_thread(
+                news_agent.process_request,
                 user_prompt=query,
                 session_id='apify-session'  # Single session for Apify runs
             )
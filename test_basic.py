@@ -4,7 +4,7 @@ Minimal test to verify Python runs on Azure
 print("Python is working!")
 print("Starting basic HTTP server...")
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import os
 
 class SimpleHandler(BaseHTTPRequestHandler):
@@ -19,6 +19,6 @@ class SimpleHandler(BaseHTTPRequestHandler):
 
 if __name__ == "__main__":
     port = int(os.environ.get("WEBSITES_PORT", 8000))
-    server = HTTPServer(('0.0.0.0', port), SimpleHandler)
+    server = ThreadingHTTPServer(('0.0.0.0', port), SimpleHandler)
     print(f"Server started on port {port}")
     server.serve_forever()
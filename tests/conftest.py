@@ -1,21 +1,33 @@
 """
 Pytest configuration and shared fixtures for newsapi-ai tests.
 """
+import sys
+import orjson
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, create_autospec, patch
 from datetime import datetime
 from types import SimpleNamespace
 
 
-@pytest.fixture
-def mock_newsapi_client(monkeypatch):
+@pytest.fixture(scope="session", autouse=True)
+def _mock_openai():
+    """Stand in for the optional openai package (Azure query optimizer) during tests."""
+    if "openai" in sys.modules:
+        yield
+        return
+    with patch.dict(sys.modules, {"openai": Mock()}):
+        yield
+
+
+@pytest.fixture(scope="session")
+def mock_newsapi_payload():
     """
-    Mock NewsAPI client to avoid real API calls in unit tests.
+    Canned NewsAPI response body, built and encoded once per test session.
 
-    This fixture patches the requests.Session.get method used by NewsAPIClient
-    to return mock data instead of making real HTTP requests.
+    Returns:
+        Tuple of (decoded response data, encoded response body)
     """
-    mock_response_data = {
+    data = {
         'status': 'ok',
         'totalResults': 10,
         'articles': [
@@ -52,9 +64,23 @@ def mock_newsapi_client(monkeypatch):
         ]
     }
 
+    return data, orjson.dumps(data)
+
+
+@pytest.fixture
+def mock_newsapi_client(mock_newsapi_payload):
+    """
+    Mock NewsAPI client to avoid real API calls in unit tests.
+
+    This fixture patches the requests.Session.get method used by NewsAPIClient
+    to return mock data instead of making real HTTP requests.
+    """
+    mock_response_data, mock_response_content = mock_newsapi_payload
+
     # Create a mock response object
     mock_response = Mock()
     mock_response.json.return_value = mock_response_data
+    mock_response.content = mock_response_content
     mock_response.raise_for_status = Mock()
 
     # Patch requests.Session.get to return our mock response
@@ -62,6 +88,75 @@ def mock_newsapi_client(monkeypatch):
         yield mock_response
 
 
+@pytest.fixture(scope="session")
+def app():
+    """
+    The FastAPI application, imported on first use.
+
+    Importing the server pulls in FastAPI, Starlette and the Anthropic SDK, so
+    it is deferred until a test needs it rather than done during collection.
+    """
+    from src.api_server.main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """
+    FastAPI test client, created once per test session.
+
+    Tests replace the module-level agent with the mock_agent fixture, so sharing
+    the client does not share agent state.
+    """
+    from fastapi.testclient import TestClient
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def _anthropic_spec():
+    """
+    Autospecced Anthropic client, built once per session.
+
+    Autospeccing walks the SDK's attribute surface, so it is reset per test
+    rather than rebuilt. messages is a cached_property the spec can't see
+    through, so the Messages resource is specced separately.
+    """
+    from anthropic import Anthropic
+    from anthropic.resources import Messages
+
+    client = create_autospec(Anthropic, instance=True)
+    client.messages = create_autospec(Messages, instance=True)
+    return client
+
+
+@pytest.fixture(scope="session")
+def _news_client_spec():
+    """Autospecced NewsAPIClient, built once per session."""
+    from src.api_client.news_client import NewsAPIClient
+    return create_autospec(NewsAPIClient, instance=True)
+
+
+@pytest.fixture
+def mock_anthropic(_anthropic_spec):
+    """Anthropic client mock with a clean call history, return values and side effects."""
+    _anthropic_spec.reset_mock(return_value=True, side_effect=True)
+    return _anthropic_spec
+
+
+@pytest.fixture
+def mock_news_client(_news_client_spec):
+    """NewsAPIClient mock with a clean call history, return values and side effects."""
+    _news_client_spec.reset_mock(return_value=True, side_effect=True)
+    return _news_client_spec
+
+
+@pytest.fixture
+def agent(mock_anthropic, mock_news_client):
+    """NewsAgent wired to the mock_anthropic and mock_news_client fixtures."""
+    from src.intent.news_agent import NewsAgent
+    return NewsAgent(mock_anthropic, mock_news_client)
+
+
 @pytest.fixture
 def mock_anthropic_client():
     """
@@ -173,3 +268,53 @@ def create_tool_block(name: str, input_data: dict, tool_id: str = "tool_123"):
         input=input_data,
         id=tool_id
     )
+
+
+def response_json(response):
+    """
+    Decode a test client response body with orjson.
+
+    Args:
+        response: httpx/TestClient response
+
+    Returns:
+        Decoded JSON body
+    """
+    return orjson.loads(response.content)
+
+
+def text_response(text: str):
+    """
+    Create a final (end_turn) Anthropic message with a single text block.
+
+    Usage:
+        mock_anthropic.messages.create.return_value = text_response("Done.")
+    """
+    return SimpleNamespace(stop_reason="end_turn", content=[create_text_block(text)])
+
+
+def tool_use_response(name: str, input_data: dict, tool_id: str = "tool_123"):
+    """
+    Create a tool_use Anthropic message with a single tool use block.
+
+    Usage:
+        tool_response = tool_use_response("search_everything", {"q": "AI"})
+    """
+    return SimpleNamespace(stop_reason="tool_use", content=[create_tool_block(name, input_data, tool_id)])
+
+
+def queue_responses(anthropic_client, *responses):
+    """
+    Set the messages Claude returns from messages.create.
+
+    A single response is returned for every call; several are returned once
+    each, in order.
+
+    Usage:
+        queue_responses(mock_anthropic, tool_use_response("get_sources", {}), text_response("Done."))
+    """
+    create = anthropic_client.messages.create
+    if len(responses) == 1:
+        create.return_value = responses[0]
+    else:
+        create.side_effect = responses
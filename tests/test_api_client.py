@@ -10,18 +10,24 @@ This module consolidates tests for:
 Tests require NEWS_API_KEY and optionally ANTHROPIC_API_KEY.
 """
 import pytest
-from datetime import datetime, timedelta
+import asyncio
+import orjson
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
 import sys
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.api_client import (
     NewsAPIClient,
     QueryOptimizer,
+    SemanticCache,
     Article,
     SearchResult,
 )
+from src.api_client.models import UserQuery
 from src.config.settings import get_settings
 
 
@@ -31,7 +37,6 @@ class TestNewsAPIClient:
     @pytest.mark.unit
     def test_basic_search(self, mock_newsapi_client):
         """Test basic article search (mocked)"""
-        from src.api_client.models import UserQuery
         with NewsAPIClient() as client:
             user_query = UserQuery(
                 q="technology",
@@ -47,7 +52,6 @@ class TestNewsAPIClient:
     @pytest.mark.unit
     def test_search_with_dates(self, mock_newsapi_client):
         """Test search with date range (mocked)"""
-        from src.api_client.models import UserQuery
         from_date = datetime.now() - timedelta(days=7)
         to_date = datetime.now()
 
@@ -66,7 +70,6 @@ class TestNewsAPIClient:
     @pytest.mark.unit
     def test_top_headlines(self, mock_newsapi_client):
         """Test fetching top headlines (mocked)"""
-        from src.api_client.models import UserQuery
         with NewsAPIClient() as client:
             user_query = UserQuery(
                 countries=["us"],
@@ -77,6 +80,85 @@ class TestNewsAPIClient:
             assert results['status'] == 'ok'
             assert 'articles' in results
 
+    @pytest.mark.unit
+    def test_repeated_search_served_from_cache(self, mock_newsapi_client):
+        """Test identical requests hit NewsAPI only once (mocked)"""
+        with NewsAPIClient(api_key="test-key") as client:
+            user_query = UserQuery(q="technology", languages=["en", "en"], pageSize=5)
+            with patch('requests.Session.get', return_value=mock_newsapi_client) as mock_get:
+                first = client.search_everything(user_query)
+                expected = orjson.loads(orjson.dumps(first))
+                first['articles'][0]['title'] = "Edited by caller"
+                second = client.search_everything(user_query)
+
+            assert second == expected
+            assert mock_get.call_count == 1
+
+    @pytest.mark.unit
+    def test_error_responses_not_cached(self):
+        """Test NewsAPI error bodies are retried instead of served from cache (mocked)"""
+
+        error_response = MagicMock()
+        error_response.content = b'{"status": "error", "message": "rateLimited"}'
+
+        with NewsAPIClient(api_key="test-key") as client:
+            user_query = UserQuery(q="technology", pageSize=5)
+            with patch('requests.Session.get', return_value=error_response) as mock_get:
+                client.search_everything(user_query)
+                client.search_everything(user_query)
+
+            assert mock_get.call_count == 2
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("total_results, max_results, expected_pages", [
+        (6, 6, [1, 2, 3]),
+        (3, 100, [1, 2]),
+        (50, 5, [1, 2, 3]),
+        (2, 100, [1]),
+        (20, 20, list(range(1, 11))),
+    ])
+    def test_pagination_fetches_remaining_pages(self, total_results, max_results, expected_pages):
+        """Test only the pages needed for totalResults and max_results are requested (mocked)"""
+
+        def fake_get(url, params=None, timeout=None):
+            page = params['page']
+            response = MagicMock()
+            response.content = orjson.dumps({
+                "status": "ok",
+                "totalResults": total_results,
+                "articles": [{"url": f"https://example.com/{page}/{i}"} for i in range(2)]
+            })
+            return response
+
+        with NewsAPIClient(api_key="test-key") as client:
+            user_query = UserQuery(q="technology", pageSize=2, max_results=max_results)
+            with patch('requests.Session.get', side_effect=fake_get) as mock_get:
+                results = client.search_everything(user_query)
+
+            assert sorted(call.kwargs['params']['page'] for call in mock_get.call_args_list) == expected_pages
+            assert results['totalResults'] == min(2 * len(expected_pages), max_results)
+
+    @pytest.mark.unit
+    def test_query_variants_stop_at_max_results(self):
+        """Test later query variants are not requested once max_results is filled (mocked)"""
+
+        def fake_get(url, params=None, timeout=None):
+            response = MagicMock()
+            response.content = orjson.dumps({
+                "status": "ok",
+                "totalResults": 2,
+                "articles": [{"url": f"https://example.com/{params['language']}/{i}"} for i in range(2)]
+            })
+            return response
+
+        with NewsAPIClient(api_key="test-key") as client:
+            user_query = UserQuery(q="technology", languages=["en", "de", "fr"], pageSize=2, max_results=4)
+            with patch('requests.Session.get', side_effect=fake_get) as mock_get:
+                results = client.search_everything(user_query)
+
+            assert sorted(call.kwargs['params']['language'] for call in mock_get.call_args_list) == ["de", "en"]
+            assert results['totalResults'] == 4
+
     @pytest.mark.integration
     def test_newsapi_live_smoke_test(self):
         """
@@ -85,7 +167,6 @@ class TestNewsAPIClient:
         This test makes an actual API call and is skipped by default.
         Run with: pytest -m integration
         """
-        from src.api_client.models import UserQuery
         settings = get_settings()
         if not settings.news_api_key:
             pytest.skip("NEWS_API_KEY not set in environment")
@@ -121,6 +202,162 @@ class TestQueryOptimizer:
             assert hasattr(query, 'q')
             assert query.q  # Query string should not be empty
 
+    @pytest.mark.unit
+    def test_repeated_input_served_from_cache(self):
+        """Test identical inputs reuse the cached optimization (mocked)"""
+        optimizer = QueryOptimizer(provider="anthropic", api_key="test-key")
+        llm_response = '{"queries": [{"q": "solar power", "sources": ["bbc-news"]}, {"q": "wind energy"}]}'
+
+        with patch.object(QueryOptimizer, '_call_llm', return_value=llm_response) as mock_llm:
+            first = optimizer.optimize_query("cache test: renewable energy news")
+            first[0].sources.append("cnn")
+            second = optimizer.optimize_query("cache test: renewable energy news")
+
+        assert mock_llm.call_count == 1
+        assert [q.q for q in first] == [q.q for q in second] == ["solar power", "wind energy"]
+        assert first[0] is not second[0]
+        assert second[0].sources == ["bbc-news"]
+
+    @pytest.mark.unit
+    def test_malformed_llm_fields_ignored(self):
+        """Test wrongly typed fields from the LLM are dropped before UserQuery validation"""
+        optimizer = QueryOptimizer(provider="anthropic", api_key="test-key")
+
+        user_queries = optimizer._build_user_queries({"queries": [
+            {"q": "elections", "languages": "en", "pageSize": "10", "countries": ["us"]},
+            {"q": ["not", "a", "string"]},
+        ]})
+
+        assert len(user_queries) == 1
+        assert user_queries[0].languages is None
+        assert user_queries[0].pageSize == 100
+        assert user_queries[0].countries == ["us"]
+
+    @pytest.mark.unit
+    def test_optimize_queries_batches_llm_call(self):
+        """Test several inputs are optimized with one LLM call (mocked)"""
+        optimizer = QueryOptimizer(provider="anthropic", api_key="test-key")
+        llm_response = '{"batch": [{"queries": [{"q": "batch one"}]}, {"queries": [{"q": "batch two"}, {"q": "batch 2"}]}]}'
+
+        with patch.object(QueryOptimizer, '_call_llm', return_value=llm_response) as mock_llm:
+            results = optimizer.optimize_queries(["batch test: first", "batch test: second"])
+
+        assert mock_llm.call_count == 1
+        assert [[q.q for q in queries] for queries in results] == [["batch one"], ["batch two", "batch 2"]]
+
+    @pytest.mark.unit
+    def test_optimize_query_async_gathers(self):
+        """Test async optimization of several inputs concurrently (mocked)"""
+        optimizer = QueryOptimizer(provider="anthropic", api_key="test-key")
+        llm_response = '{"queries": [{"q": "gathered"}]}'
+
+        async def run():
+            return await asyncio.gather(
+                optimizer.optimize_query_async("async test: one"),
+                optimizer.optimize_query_async("async test: two"),
+            )
+
+        with patch.object(QueryOptimizer, '_call_llm', return_value=llm_response):
+            results = asyncio.run(run())
+
+        assert [[q.q for q in queries] for queries in results] == [["gathered"], ["gathered"]]
+
+    @pytest.mark.unit
+    def test_iter_optimized_queries_streams(self):
+        """Test queries are yielded as the streamed response completes them (mocked)"""
+        optimizer = QueryOptimizer(provider="anthropic", api_key="test-key")
+        chunks = ['```json\n{"queries": [{"q": "first', ' \\"one\\""}, {"q": "sec', 'ond"}]}\n```']
+        consumed = []
+
+        def stream(_self, _user_input):
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        with patch.object(QueryOptimizer, '_stream_llm', stream):
+            queries = optimizer.iter_optimized_queries("stream test: two angles")
+            first = next(queries)
+            assert first.q == 'first "one"'
+            assert len(consumed) == 2  # yielded before the stream finished
+            assert [q.q for q in queries] == ["second"]
+
+        # The complete response is cached for later calls
+        with patch.object(QueryOptimizer, '_call_llm') as mock_llm:
+            assert [q.q for q in optimizer.optimize_query("stream test: two angles")] == ['first "one"', "second"]
+        mock_llm.assert_not_called()
+
+
+class TestSemanticCache:
+    """Test embedding-based prompt cache"""
+
+    @pytest.fixture
+    def cache(self):
+        np = pytest.importorskip("numpy")
+
+        vocabulary = ["news", "electric", "vehicle", "ev", "recent", "latest", "sports"]
+        synonyms = {"ev": "electric", "recent": "latest"}
+
+        def encode(text):
+            words = [synonyms.get(w, w) for w in text.lower().split()]
+            if "electric" in words and "vehicle" not in words:
+                words.append("vehicle")
+            return np.array([words.count(v) for v in vocabulary], dtype=np.float32)
+
+        return SemanticCache(encoder=encode, threshold=0.95, max_entries=2)
+
+    @pytest.mark.unit
+    def test_paraphrase_hits(self, cache):
+        """Test a paraphrased prompt returns the cached value"""
+        cache.put("latest electric vehicle news", {"queries": [{"q": "EV"}]})
+
+        assert cache.get("recent ev news") == {"queries": [{"q": "EV"}]}
+        assert cache.get("latest sports news") is None
+
+    @pytest.mark.unit
+    def test_evicts_oldest_entries(self, cache):
+        """Test the cache is bounded by max_entries"""
+        cache.put("electric", 1)
+        cache.put("sports", 2)
+        cache.put("news", 3)
+
+        assert len(cache) == 2
+        assert cache.get("electric") is None
+        assert cache.get("news") == 3
+
+    @pytest.mark.unit
+    def test_entries_expire(self, cache):
+        """Test entries older than the TTL are no longer served"""
+        with patch("src.api_client.semantic_cache.monotonic", return_value=1000.0):
+            cache.put("electric", 1)
+        with patch("src.api_client.semantic_cache.monotonic", return_value=1000.0 + cache.ttl / 2):
+            cache.put("sports", 2)
+
+        with patch("src.api_client.semantic_cache.monotonic", return_value=1001.0 + cache.ttl):
+            assert cache.get("electric") is None
+            assert cache.get("sports") == 2
+            assert len(cache) == 1
+
+    @pytest.mark.unit
+    def test_warm_from_file(self, cache, tmp_path):
+        """Test entries loaded from a warm file answer paraphrases"""
+        warm_file = tmp_path / "warm.json"
+        warm_file.write_bytes(orjson.dumps([
+            {"prompt": "latest electric vehicle news", "result": "ev"},
+            {"prompt": "latest sports news", "result": "sports"},
+        ]))
+
+        assert cache.warm(warm_file) == 2
+        assert cache.get("recent ev news") == "ev"
+        assert cache.get("sports news latest") == "sports"
+
+    @pytest.mark.unit
+    def test_embeddings_stored_as_int8(self, cache):
+        """Test embeddings are quantized and still match exactly repeated prompts"""
+        cache.put("latest electric vehicle news", "ev")
+
+        assert cache._embeddings.dtype.name == "int8"
+        assert cache.get("latest electric vehicle news") == "ev"
+
 
 class TestArticleDataModel:
     """Test Article data model"""
@@ -128,7 +365,6 @@ class TestArticleDataModel:
     @pytest.mark.unit
     def test_article_from_newsapi(self, mock_newsapi_client):
         """Test creating Article from NewsAPI data (mocked)"""
-        from src.api_client.models import UserQuery
         with NewsAPIClient() as client:
             user_query = UserQuery(q="climate", pageSize=3)
             results = client.search_everything(user_query)
@@ -143,6 +379,46 @@ class TestArticleDataModel:
                 assert article.url
                 assert article.title
 
+    @pytest.mark.unit
+    def test_search_result_extend_articles(self):
+        """Test bulk-adding articles updates total_found once"""
+        articles = [
+            Article.from_newsapi({'title': f'Article {i}', 'url': f'https://example.com/{i}'})
+            for i in range(3)
+        ]
+        search_result = SearchResult(query=UserQuery(q="climate"))
+
+        search_result.extend_articles(articles)
+
+        assert search_result.total_found == 3
+        assert search_result.articles == articles
+
+    @pytest.mark.unit
+    def test_user_query_to_dict(self):
+        """Test to_dict matches asdict for public fields and omits source chunks"""
+        user_query = UserQuery(q="climate", sources=["bbc-news", "cnn"], languages=["en"])
+
+        query_dict = user_query.to_dict()
+
+        assert "_source_chunks" not in query_dict
+        assert query_dict == {k: v for k, v in asdict(user_query).items() if k != "_source_chunks"}
+
+    @pytest.mark.unit
+    def test_user_query_filters_code_fields(self, caplog):
+        """Test code-list fields are lowercased and filtered, falling back to defaults"""
+        user_query = UserQuery(
+            q="climate",
+            languages=["EN", "xx"],
+            countries=["zz"],
+            searchIn=["title", "description", "content"],
+        )
+
+        assert user_query.languages == ["en"]
+        assert user_query.countries is None  # All invalid
+        assert user_query.searchIn is None  # Every field is the API default
+        assert "Invalid ISO-639-1 language codes removed: ['xx']" in caplog.text
+        assert "All country codes were invalid" in caplog.text
+
 
 
 class TestCompleteWorkflow:
@@ -204,8 +480,7 @@ class TestCompleteWorkflow:
             total_found=results['totalResults']
         )
 
-        for article in articles:
-            search_result.add_article(article)
+        search_result.extend_articles(articles)
 
         print(f"  Total articles: {search_result.total_found}")
 
@@ -231,7 +506,6 @@ class TestAPIErrorHandling:
     @pytest.mark.integration
     def test_newsapi_invalid_query(self, check_news_api_key):
         """Test NewsAPI with invalid query parameters (MAKES REAL API CALLS)"""
-        from src.api_client.models import UserQuery
         with NewsAPIClient() as client:
             # Empty query should raise ValueError
             try:
@@ -350,6 +624,16 @@ class TestAPIErrorHandling:
         # Should handle missing fields gracefully
         assert article.description is None or article.description == ""
 
+    def test_article_parses_utc_timestamp(self):
+        """Test Article parses NewsAPI's 'Z'-suffixed publishedAt timestamps"""
+        article = Article.from_newsapi({
+            "url": "https://example.com/article",
+            "title": "Test Article",
+            "publishedAt": "2025-11-01T10:00:00Z"
+        })
+
+        assert article.published_at == datetime(2025, 11, 1, 10, 0, tzinfo=timezone.utc)
+
 
 
 if __name__ == "__main__":
@@ -11,26 +11,55 @@ This module tests:
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from fastapi.testclient import TestClient
-import json
-import sys
+import orjson
 
-# Mock the Azure OpenAI import before importing the module
-sys.modules['openai'] = Mock()
-
-from src.api_server.main import app
+from conftest import response_json
 from src.api_server.models import QueryRequest, QueryResponse, HealthResponse
 
 
-@pytest.fixture
-def client():
-    """Create a test client."""
-    return TestClient(app)
+# Serialized search result returned by the mocked agent's tool call
+_TOOL_RESULT_JSON = orjson.dumps({
+    "status": "ok",
+    "total_results": 5,
+    "articles": [
+        {
+            "title": "AI Breakthrough",
+            "description": "New AI technology",
+            "url": "https://example.com/ai1",
+            "publishedAt": "2025-11-02T10:00:00Z"
+        },
+        {
+            "title": "Machine Learning Advances",
+            "description": "ML progress",
+            "url": "https://example.com/ai2",
+            "publishedAt": "2025-11-01T15:00:00Z"
+        }
+    ]
+}).decode()
 
 
 @pytest.fixture
+def mock_agent():
+    """Replace the server's NewsAgent with a Mock for the duration of a test."""
+    with patch('src.api_server.main.news_agent') as agent:
+        yield agent
+
+
+# "Find news about AI" request bodies per response format, encoded once
+_QUERY_BODIES = {
+    response_format: orjson.dumps({"query": "Find news about AI", "response_format": response_format})
+    for response_format in ("natural", "structured", "both")
+}
+
+
+def _post_query(client, response_format):
+    """POST the pre-encoded "Find news about AI" query in the given response format."""
+    return client.post("/query", content=_QUERY_BODIES[response_format], headers={"Content-Type": "application/json"})
+
+
+@pytest.fixture(scope="session")
 def mock_agent_response():
-    """Mock successful agent response."""
+    """Mock successful agent response (shared; tests must not mutate it)."""
     return {
         "response": "I found 5 articles about AI technology.",
         "messages": [
@@ -41,24 +70,7 @@ def mock_agent_response():
                     {
                         "type": "tool_result",
                         "tool_use_id": "tool_123",
-                        "content": json.dumps({
-                            "status": "ok",
-                            "total_results": 5,
-                            "articles": [
-                                {
-                                    "title": "AI Breakthrough",
-                                    "description": "New AI technology",
-                                    "url": "https://example.com/ai1",
-                                    "publishedAt": "2025-11-02T10:00:00Z"
-                                },
-                                {
-                                    "title": "Machine Learning Advances",
-                                    "description": "ML progress",
-                                    "url": "https://example.com/ai2",
-                                    "publishedAt": "2025-11-01T15:00:00Z"
-                                }
-                            ]
-                        })
+                        "content": _TOOL_RESULT_JSON
                     }
                 ]
             }
@@ -74,7 +86,7 @@ class TestHealthEndpoint:
         response = client.get("/health")
 
         assert response.status_code == 200
-        data = response.json()
+        data = response_json(response)
         assert data["status"] == "ok"
         assert "services" in data
         assert "version" in data
@@ -82,7 +94,7 @@ class TestHealthEndpoint:
     def test_health_check_structure(self, client):
         """Test health check response structure."""
         response = client.get("/health")
-        data = response.json()
+        data = response_json(response)
 
         assert "anthropic" in data["services"]
         assert "newsapi" in data["services"]
@@ -92,65 +104,34 @@ class TestHealthEndpoint:
 class TestQueryEndpoint:
     """Test the main query endpoint."""
 
-    @patch('src.api_server.main.news_agent')
-    def test_query_with_natural_response(self, mock_agent, client, mock_agent_response):
-        """Test query endpoint with natural language response."""
+    @pytest.mark.parametrize("response_format,expect_response,expect_articles", [
+        ("natural", True, False),
+        ("structured", False, True),
+        ("both", True, True),
+    ])
+    def test_query_response_formats(self, mock_agent, client, mock_agent_response,
+                                    response_format, expect_response, expect_articles):
+        """Test query endpoint returns the parts of the answer the format asks for."""
         mock_agent.process_request.return_value = mock_agent_response
 
-        request_data = {
-            "query": "Find news about AI",
-            "response_format": "natural"
-        }
-
-        response = client.post("/query", json=request_data)
-
-        assert response.status_code == 200
-        data = response.json()
-        assert "response" in data
-        assert data["response"] == "I found 5 articles about AI technology."
-        assert data["format"] == "natural"
-
-    @patch('src.api_server.main.news_agent')
-    def test_query_with_structured_response(self, mock_agent, client, mock_agent_response):
-        """Test query endpoint with structured response."""
-        mock_agent.process_request.return_value = mock_agent_response
-
-        request_data = {
-            "query": "Find news about AI",
-            "response_format": "structured"
-        }
-
-        response = client.post("/query", json=request_data)
+        response = _post_query(client, response_format)
 
         assert response.status_code == 200
-        data = response.json()
-        assert "articles" in data
-        assert len(data["articles"]) == 2
-        assert data["articles"][0]["title"] == "AI Breakthrough"
-        assert data["total_results"] == 5
-        assert data["format"] == "structured"
+        data = response_json(response)
+        assert data["format"] == response_format
 
-    @patch('src.api_server.main.news_agent')
-    def test_query_with_both_formats(self, mock_agent, client, mock_agent_response):
-        """Test query endpoint with both response formats."""
-        mock_agent.process_request.return_value = mock_agent_response
+        if expect_response:
+            assert data["response"] == "I found 5 articles about AI technology."
+        else:
+            assert data.get("response") is None
 
-        request_data = {
-            "query": "Find news about AI",
-            "response_format": "both"
-        }
+        if expect_articles:
+            assert len(data["articles"]) == 2
+            assert data["articles"][0]["title"] == "AI Breakthrough"
+            assert data["total_results"] == 5
+        else:
+            assert data.get("articles") is None
 
-        response = client.post("/query", json=request_data)
-
-        assert response.status_code == 200
-        data = response.json()
-        assert "response" in data
-        assert "articles" in data
-        assert data["response"] == "I found 5 articles about AI technology."
-        assert len(data["articles"]) == 2
-        assert data["format"] == "both"
-
-    @patch('src.api_server.main.news_agent')
     def test_query_with_session_id(self, mock_agent, client, mock_agent_response):
         """Test query endpoint maintains session ID."""
         mock_agent.process_request.return_value = mock_agent_response
@@ -164,27 +145,21 @@ class TestQueryEndpoint:
         response = client.post("/query", json=request_data)
 
         assert response.status_code == 200
-        data = response.json()
+        data = response_json(response)
         assert data["session_id"] == "session_123"
         mock_agent.process_request.assert_called_once_with(
             user_prompt="Find news about AI",
             session_id="session_123"
         )
 
-    @patch('src.api_server.main.news_agent')
     def test_query_generates_session_id(self, mock_agent, client, mock_agent_response):
         """Test query endpoint generates session ID if not provided."""
         mock_agent.process_request.return_value = mock_agent_response
 
-        request_data = {
-            "query": "Find news about AI",
-            "response_format": "natural"
-        }
-
-        response = client.post("/query", json=request_data)
+        response = _post_query(client, "natural")
 
         assert response.status_code == 200
-        data = response.json()
+        data = response_json(response)
         # Should have a session_id in response
         assert "session_id" in data
         assert data["session_id"] is not None
@@ -196,6 +171,61 @@ class TestQueryEndpoint:
         except:
             valid_uuid = False
         assert valid_uuid
+        # The agent answers statelessly and the turn is stored under the new id
+        assert mock_agent.process_request.call_args.kwargs["session_id"] is None
+        mock_agent.save_session.assert_called_once_with(
+            data["session_id"], mock_agent_response["messages"]
+        )
+
+    def test_concurrent_queries_run_in_parallel(self, app, mock_agent, mock_agent_response):
+        """Test the blocking agent runs off the event loop, so concurrent queries overlap."""
+        import asyncio
+        import threading
+        import httpx
+
+        both_running = threading.Barrier(2, timeout=5)
+
+        def process_request(**kwargs):
+            both_running.wait()  # Raises BrokenBarrierError if requests are serialized
+            return mock_agent_response
+
+        async def post_concurrently():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+                return await asyncio.gather(*(
+                    async_client.post("/query", content=_QUERY_BODIES["natural"],
+                                      headers={"Content-Type": "application/json"})
+                    for _ in range(2)
+                ))
+
+        mock_agent.process_request.side_effect = process_request
+        responses = asyncio.run(post_concurrently())
+
+        assert [response.status_code for response in responses] == [200, 200]
+
+    @pytest.mark.parametrize("allow_cache_bypass", [True, False])
+    def test_cache_bypass_header(self, mock_agent, client, mock_agent_response, allow_cache_bypass):
+        """Test X-Cache-Bypass uses an uncached, closed-after-use client only when the setting allows it."""
+        mock_agent.process_request.return_value = mock_agent_response
+
+        with patch('src.api_server.main.settings.allow_cache_bypass', allow_cache_bypass), \
+                patch('src.api_server.main.news_client', Mock(api_key="server-key")), \
+                patch('src.api_server.main.NewsAPIClient') as client_class:
+            response = client.post(
+                "/query",
+                content=_QUERY_BODIES["natural"],
+                headers={"Content-Type": "application/json", "X-Cache-Bypass": "1"}
+            )
+
+        assert response.status_code == 200
+        custom_news_client = mock_agent.process_request.call_args.kwargs["custom_news_client"]
+        if allow_cache_bypass:
+            client_class.assert_called_once_with(api_key="server-key", cache_ttl=0)
+            assert custom_news_client is client_class.return_value
+            custom_news_client.close.assert_called_once()
+        else:
+            client_class.assert_not_called()
+            assert custom_news_client is None
 
     def test_query_without_agent(self, client):
         """Test query endpoint when agent is not configured."""
@@ -207,10 +237,9 @@ class TestQueryEndpoint:
             response = client.post("/query", json=request_data)
 
             assert response.status_code == 503
-            data = response.json()
+            data = response_json(response)
             assert "error" in data
 
-    @patch('src.api_server.main.news_agent')
     def test_query_handles_agent_error(self, mock_agent, client):
         """Test query endpoint handles agent errors gracefully."""
         mock_agent.process_request.side_effect = Exception("Agent error")
@@ -222,7 +251,7 @@ class TestQueryEndpoint:
         response = client.post("/query", json=request_data)
 
         assert response.status_code == 500
-        data = response.json()
+        data = response_json(response)
         assert "error" in data
 
     def test_query_validates_request(self, client):
@@ -330,26 +359,84 @@ class TestResponseModels:
 class TestArticleExtraction:
     """Test article extraction from messages."""
 
-    @patch('src.api_server.main.news_agent')
     def test_extract_articles_from_messages(self, mock_agent, client, mock_agent_response):
         """Test that articles are correctly extracted from tool results."""
         mock_agent.process_request.return_value = mock_agent_response
 
-        request_data = {
-            "query": "Find news about AI",
-            "response_format": "structured"
-        }
-
-        response = client.post("/query", json=request_data)
+        response = _post_query(client, "structured")
 
         assert response.status_code == 200
-        data = response.json()
+        data = response_json(response)
         assert "articles" in data
         assert len(data["articles"]) == 2
         assert data["articles"][0]["title"] == "AI Breakthrough"
         assert data["articles"][1]["title"] == "Machine Learning Advances"
 
-    @patch('src.api_server.main.news_agent')
+    @pytest.mark.parametrize("app_env", ["development", "production"])
+    def test_extracted_articles_serialize_in_every_environment(self, mock_agent, client, app_env):
+        """Test validated (development) and unvalidated (production) article models serialize the same."""
+        article = {
+            "source": {"id": "bbc-news", "name": "BBC News"},
+            "title": "AI Breakthrough",
+            "url": "https://example.com/ai1",
+            "publishedAt": "2025-11-02T10:00:00Z",
+            "content": "Dropped from the response"
+        }
+        mock_agent.process_request.return_value = {
+            "response": "Found one article.",
+            "messages": [{
+                "role": "user",
+                "content": [{
+                    "type": "tool_result",
+                    "tool_use_id": "tool_123",
+                    "content": orjson.dumps({"status": "ok", "total_results": 1, "articles": [article]}).decode()
+                }]
+            }]
+        }
+
+        with patch('src.api_server.main.settings.app_env', app_env):
+            response = _post_query(client, "structured")
+
+        assert response.status_code == 200
+        assert response_json(response)["articles"] == [{
+            "title": "AI Breakthrough",
+            "description": None,
+            "url": "https://example.com/ai1",
+            "source": {"id": "bbc-news", "name": "BBC News"},
+            "publishedAt": "2025-11-02T10:00:00Z",
+            "author": None,
+            "urlToImage": None
+        }]
+
+    def test_extract_articles_from_latest_turn_only(self, mock_agent, client, mock_agent_response):
+        """Test that articles from earlier requests in the session are not returned again."""
+        earlier_turn = [
+            {"role": "user", "content": "Find news about space"},
+            {
+                "role": "user",
+                "content": [{
+                    "type": "tool_result",
+                    "tool_use_id": "tool_001",
+                    "content": orjson.dumps({
+                        "status": "ok",
+                        "total_results": 1,
+                        "articles": [{"title": "Rocket Launch", "url": "https://example.com/space1"}]
+                    }).decode()
+                }]
+            },
+            {"role": "assistant", "content": "Here is the space news."}
+        ]
+        mock_agent.process_request.return_value = {
+            **mock_agent_response,
+            "messages": earlier_turn + mock_agent_response["messages"]
+        }
+
+        response = _post_query(client, "structured")
+
+        assert response.status_code == 200
+        titles = [article["title"] for article in response_json(response)["articles"]]
+        assert titles == ["AI Breakthrough", "Machine Learning Advances"]
+
     def test_no_articles_in_messages(self, mock_agent, client):
         """Test when no articles are present in messages."""
         mock_agent.process_request.return_value = {
@@ -359,15 +446,10 @@ class TestArticleExtraction:
             ]
         }
 
-        request_data = {
-            "query": "Find news about AI",
-            "response_format": "structured"
-        }
-
-        response = client.post("/query", json=request_data)
+        response = _post_query(client, "structured")
 
         assert response.status_code == 200
-        data = response.json()
+        data = response_json(response)
         assert data.get("articles") is None
 
 
@@ -383,11 +465,59 @@ class TestCORS:
         assert "access-control-allow-origin" in response.headers or response.status_code == 200
         # Just verify the endpoint works - CORS is configured in the app
 
+    def test_credentialed_requests_allowed_by_default(self, client):
+        """Test the default wildcard origin still answers credentialed calls with the caller's origin."""
+        origin = "https://app.example.com"
+        response = client.get("/health", headers={"Origin": origin, "Cookie": "session=1"})
+
+        assert response.headers["access-control-allow-origin"] == origin
+        assert response.headers["access-control-allow-credentials"] == "true"
+
+
+class TestStaticFiles:
+    """Test caching headers on the built web app."""
+
+    @pytest.fixture
+    def spa_client(self, tmp_path):
+        """TestClient for an app serving a minimal build output through SPAStaticFiles."""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from src.api_server.main import SPAStaticFiles
+
+        (tmp_path / "index.html").write_text("<!doctype html><title>NewsAPI AI</title>")
+        spa_app = FastAPI()
+        spa_app.mount("/", SPAStaticFiles(directory=tmp_path, html=True), name="spa")
+        return TestClient(spa_app)
+
+    @pytest.mark.parametrize("path", ["/", "/index.html", "/saved/searches", "/healthcare", "/docs-guide"])
+    def test_app_shell_revalidated(self, spa_client, path):
+        """Test index.html is served with no-cache whether requested directly or as the SPA fallback."""
+        response = spa_client.get(path)
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_rebuilt_shell_served_with_fresh_headers(self, spa_client, tmp_path):
+        """Test the fallback serves a rebuilt index.html with its current length and ETag."""
+        before = spa_client.get("/saved/searches")
+        rebuilt = "<!doctype html><title>NewsAPI AI</title><script src=/assets/app.js></script>"
+        (tmp_path / "index.html").write_text(rebuilt)
+
+        after = spa_client.get("/saved/searches")
+
+        assert after.text == rebuilt
+        assert after.headers["content-length"] == str(len(rebuilt))
+        assert after.headers["etag"] != before.headers["etag"]
+
+    def test_api_paths_not_answered_with_shell(self, spa_client):
+        """Test unknown API paths still 404 instead of returning index.html."""
+        assert spa_client.get("/query/unknown").status_code == 404
+        assert spa_client.get("/health").status_code == 404
+
 
 class TestIntegration:
     """Integration tests for the API server."""
 
-    @patch('src.api_server.main.news_agent')
     def test_full_workflow(self, mock_agent, client, mock_agent_response):
         """Test a complete workflow from request to response."""
         mock_agent.process_request.return_value = mock_agent_response
@@ -403,7 +533,7 @@ class TestIntegration:
 
         # Verify response
         assert response.status_code == 200
-        data = response.json()
+        data = response_json(response)
 
         # Check natural language response
         assert data["response"] == "I found 5 articles about AI technology."
@@ -11,8 +11,7 @@ This module tests:
 import pytest
 import logging
 import os
-from pathlib import Path
-from tempfile import TemporaryDirectory
+import re
 
 from src.config import (
     Settings,
@@ -31,6 +30,23 @@ from src.config.constants import (
     NEWSAPI_BASE_URL,
 )
 
+_INVALID_LOG_LEVEL = re.compile("log_level must be one of")
+
+
+@pytest.fixture(scope="module")
+def default_settings():
+    """
+    Settings built once per module from defaults only.
+
+    Tests that merely read default values share this instance; tests that set
+    environment variables or expect validation errors build their own.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for name in list(os.environ):
+            if name.startswith(("AZURE_", "CELERY_", "SENTRY_")) or name == "REDIS_URL":
+                mp.delenv(name)
+        yield Settings()
+
 
 class TestSettings:
     """Test Settings class and configuration management."""
@@ -82,115 +98,50 @@ class TestSettings:
         assert settings.port == 8500
         assert settings.use_mcp is True
 
-    def test_log_level_validation(self, monkeypatch):
+    @pytest.mark.parametrize("value,expected", [("debug", "DEBUG"), ("info", "INFO")])
+    def test_log_level_validation(self, value, expected):
         """Test that log_level is validated correctly."""
-        monkeypatch.setenv("LOG_LEVEL", "debug")
-        settings = Settings()
-        assert settings.log_level == "DEBUG"
-
-        monkeypatch.setenv("LOG_LEVEL", "info")
-        settings = Settings()
-        assert settings.log_level == "INFO"
+        assert Settings.from_overrides(log_level=value).log_level == expected
 
-    def test_invalid_log_level(self, monkeypatch):
+    def test_invalid_log_level(self):
         """Test that invalid log_level raises ValueError."""
-        monkeypatch.setenv("LOG_LEVEL", "INVALID")
-
-        with pytest.raises(ValueError, match="log_level must be one of"):
-            Settings()
-
-    def test_relevance_threshold_bounds(self, monkeypatch):
-        """Test that relevance_threshold enforces bounds."""
-        # Test lower bound
-        monkeypatch.setenv("RELEVANCE_THRESHOLD", "-1")
-        with pytest.raises(ValueError):
-            Settings()
-
-        # Test upper bound
-        monkeypatch.setenv("RELEVANCE_THRESHOLD", "101")
-        with pytest.raises(ValueError):
-            Settings()
-
-        # Test valid values
-        monkeypatch.setenv("RELEVANCE_THRESHOLD", "0")
-        settings = Settings()
-        assert settings.relevance_threshold == 0
-
-        monkeypatch.setenv("RELEVANCE_THRESHOLD", "100")
-        settings = Settings()
-        assert settings.relevance_threshold == 100
-
-    def test_max_articles_bounds(self, monkeypatch):
-        """Test that max_articles_per_search enforces bounds."""
-        # Test lower bound
-        monkeypatch.setenv("MAX_ARTICLES_PER_SEARCH", "0")
-        with pytest.raises(ValueError):
-            Settings()
-
-        # Test upper bound
-        monkeypatch.setenv("MAX_ARTICLES_PER_SEARCH", "1001")
-        with pytest.raises(ValueError):
-            Settings()
-
-        # Test valid values
-        monkeypatch.setenv("MAX_ARTICLES_PER_SEARCH", "1")
-        settings = Settings()
-        assert settings.max_articles_per_search == 1
-
-        monkeypatch.setenv("MAX_ARTICLES_PER_SEARCH", "1000")
-        settings = Settings()
-        assert settings.max_articles_per_search == 1000
-
-    def test_port_bounds(self, monkeypatch):
-        """Test that port enforces valid range."""
-        # Test lower bound
-        monkeypatch.setenv("PORT", "0")
-        with pytest.raises(ValueError):
-            Settings()
-
-        # Test upper bound
-        monkeypatch.setenv("PORT", "65536")
-        with pytest.raises(ValueError):
-            Settings()
-
-        # Test valid values
-        monkeypatch.setenv("PORT", "1")
-        settings = Settings()
-        assert settings.port == 1
-
-        monkeypatch.setenv("PORT", "65535")
-        settings = Settings()
-        assert settings.port == 65535
-
-    def test_is_development_property(self, monkeypatch):
-        """Test is_development property."""
-        monkeypatch.setenv("APP_ENV", "development")
-        settings = Settings()
-        assert settings.is_development is True
-        assert settings.is_production is False
-
-        monkeypatch.setenv("APP_ENV", "dev")
-        settings = Settings()
-        assert settings.is_development is True
-
-        monkeypatch.setenv("APP_ENV", "production")
-        settings = Settings()
-        assert settings.is_development is False
-
-    def test_is_production_property(self, monkeypatch):
-        """Test is_production property."""
-        monkeypatch.setenv("APP_ENV", "production")
-        settings = Settings()
-        assert settings.is_production is True
-        assert settings.is_development is False
-
-        monkeypatch.setenv("APP_ENV", "prod")
-        settings = Settings()
-        assert settings.is_production is True
-
-        monkeypatch.setenv("APP_ENV", "development")
-        settings = Settings()
-        assert settings.is_production is False
+        with pytest.raises(ValueError, match=_INVALID_LOG_LEVEL):
+            Settings.from_overrides(log_level="INVALID")
+
+    @pytest.mark.parametrize("field,value,expected", [
+        ("relevance_threshold", -1, ValueError),
+        ("relevance_threshold", 101, ValueError),
+        ("relevance_threshold", 0, 0),
+        ("relevance_threshold", 100, 100),
+        ("max_articles_per_search", 0, ValueError),
+        ("max_articles_per_search", 1001, ValueError),
+        ("max_articles_per_search", 1, 1),
+        ("max_articles_per_search", 1000, 1000),
+        ("port", 0, ValueError),
+        ("port", 65536, ValueError),
+        ("port", 1, 1),
+        ("port", 65535, 65535),
+    ])
+    def test_numeric_bounds(self, field, value, expected):
+        """Test that numeric settings enforce their bounds."""
+        if expected is ValueError:
+            with pytest.raises(ValueError):
+                Settings.from_overrides(**{field: value})
+        else:
+            assert getattr(Settings.from_overrides(**{field: value}), field) == expected
+
+    @pytest.mark.parametrize("app_env,is_development,is_production", [
+        ("development", True, False),
+        ("dev", True, False),
+        ("production", False, True),
+        ("prod", False, True),
+    ])
+    def test_environment_properties(self, default_settings, app_env, is_development, is_production):
+        """Test is_development and is_production properties."""
+        # app_env has no validator, so copying the defaults is equivalent to APP_ENV
+        settings = default_settings.model_copy(update={"app_env": app_env})
+        assert settings.is_development is is_development
+        assert settings.is_production is is_production
 
     def test_has_anthropic_property(self, monkeypatch):
         """Test has_anthropic property."""
@@ -205,75 +156,75 @@ class TestSettings:
         # Empty string is still truthy for the field, so check the actual behavior
         # The property checks if the key is not None
 
-    def test_has_azure_openai_property(self, monkeypatch):
+    def test_has_azure_openai_property(self):
         """Test has_azure_openai property."""
-        monkeypatch.delenv("AZURE_OPENAI_KEY", raising=False)
-        monkeypatch.delenv("AZURE_OPENAI_ENDPOINT", raising=False)
-        settings = Settings()
+        settings = Settings.from_overrides(azure_openai_key=None, azure_openai_endpoint=None)
         assert settings.has_azure_openai is False
 
         # Key alone is not enough
-        monkeypatch.setenv("AZURE_OPENAI_KEY", "test-key")
-        settings = Settings()
+        settings = Settings.from_overrides(azure_openai_key="test-key", azure_openai_endpoint=None)
         assert settings.has_azure_openai is False
 
         # Both key and endpoint required
-        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com/")
-        settings = Settings()
+        settings = Settings.from_overrides(
+            azure_openai_key="test-key",
+            azure_openai_endpoint="https://test.openai.azure.com/"
+        )
         assert settings.has_azure_openai is True
 
-    def test_should_use_mcp_property(self, monkeypatch):
+    def test_should_use_mcp_property(self):
         """Test should_use_mcp property."""
-        monkeypatch.setenv("USE_MCP", "false")
-        settings = Settings()
-        assert settings.should_use_mcp is False
+        assert Settings.from_overrides(use_mcp=False).should_use_mcp is False
+        assert Settings.from_overrides(use_mcp=True).should_use_mcp is True
 
-        monkeypatch.setenv("USE_MCP", "true")
-        settings = Settings()
-        assert settings.should_use_mcp is True
+    def test_cors_origin_list_property(self):
+        """Test cors_origin_list splits the comma-separated setting."""
+        settings = Settings.from_overrides(cors_origins="https://a.example.com, https://b.example.com,")
+        assert settings.cors_origin_list == ["https://a.example.com", "https://b.example.com"]
 
-    def test_azure_defaults(self, monkeypatch):
+    def test_azure_defaults(self, default_settings):
         """Test Azure-related default values."""
-        settings = Settings()
+        settings = default_settings
         assert settings.azure_openai_api_version == "2024-02-15-preview"
         assert settings.azure_storage_container_name == "newsaggregator-articles"
         assert settings.azure_cosmos_database_name == "newsaggregator"
         assert settings.azure_cosmos_container_name == "articles-metadata"
 
-    def test_celery_defaults(self, monkeypatch):
+    def test_celery_defaults(self, default_settings):
         """Test Celery-related default values."""
-        settings = Settings()
+        settings = default_settings
         assert settings.redis_url == "redis://localhost:6379/0"
         assert settings.celery_task_time_limit == 1800
         assert settings.celery_task_soft_time_limit == 1500
 
-    def test_sentry_defaults(self, monkeypatch):
+    def test_sentry_defaults(self, default_settings):
         """Test Sentry-related default values."""
-        settings = Settings()
+        settings = default_settings
         assert settings.sentry_dsn is None
         assert settings.sentry_environment is None
         assert settings.sentry_traces_sample_rate == 1.0
 
 
+@pytest.fixture
+def reset_global_settings():
+    """Clear the cached global settings before and after a test."""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
 class TestGlobalSettings:
     """Test global settings management functions."""
 
-    def test_get_settings_singleton(self, monkeypatch):
+    def test_get_settings_singleton(self, reset_global_settings):
         """Test that get_settings returns the same instance."""
-        # Reset global settings
-        import src.config.settings
-        src.config.settings.settings = None
-
         settings1 = get_settings()
         settings2 = get_settings()
 
         assert settings1 is settings2
 
-    def test_reload_settings(self, monkeypatch):
+    def test_reload_settings(self, monkeypatch, reset_global_settings):
         """Test that reload_settings creates a new instance."""
-        import src.config.settings
-        src.config.settings.settings = None
-
         monkeypatch.setenv("PORT", "8000")
         settings1 = get_settings()
         assert settings1.port == 8000
@@ -326,6 +277,18 @@ class TestConstants:
 class TestLogging:
     """Test logging configuration."""
 
+    @pytest.fixture(autouse=True)
+    def restore_root_logger(self):
+        """Put the root logger's handlers and level back after each test."""
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+        yield
+        for handler in root.handlers:
+            if handler not in handlers:
+                handler.close()
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
     def test_setup_logging_console_only(self):
         """Test logging setup with console handler only."""
         logger = setup_logging(log_level="INFO")
@@ -337,23 +300,20 @@ class TestLogging:
         console_handlers = [h for h in logger.handlers if isinstance(h, logging.StreamHandler)]
         assert len(console_handlers) >= 1
 
-    def test_setup_logging_with_file(self):
+    def test_setup_logging_with_file(self, tmp_path):
         """Test logging setup with file handler."""
-        with TemporaryDirectory() as tmpdir:
-            log_file = os.path.join(tmpdir, "test.log")
-            logger = setup_logging(log_level="DEBUG", log_file=log_file)
+        log_file = tmp_path / "test.log"
+        logger = setup_logging(log_level="DEBUG", log_file=str(log_file))
 
-            assert logger.level == logging.DEBUG
-            assert Path(log_file).exists()
+        assert logger.level == logging.DEBUG
+        assert log_file.exists()
 
-            # Test that logging works
-            test_logger = get_logger("test")
-            test_logger.info("Test message")
+        # Test that logging works
+        test_logger = get_logger("test")
+        test_logger.info("Test message")
 
-            # Verify file has content
-            with open(log_file, "r") as f:
-                content = f.read()
-                assert "Test message" in content
+        # Verify file has content
+        assert "Test message" in log_file.read_text()
 
     def test_setup_logging_levels(self):
         """Test different logging levels."""
@@ -361,6 +321,14 @@ class TestLogging:
             logger = setup_logging(log_level=level)
             assert logger.level == getattr(logging, level)
 
+    def test_setup_logging_idempotent(self):
+        """Test repeated setup with the same config keeps the existing handlers."""
+        logger = setup_logging(log_level="INFO", force=True)
+        handlers = list(logger.handlers)
+
+        assert setup_logging(log_level="INFO").handlers == handlers
+        assert setup_logging(log_level="INFO", force=True).handlers != handlers
+
     def test_get_logger(self):
         """Test get_logger function."""
         logger = get_logger("test_module")
@@ -378,25 +346,23 @@ class TestLogging:
         assert isinstance(logger, logging.Logger)
         assert "TestClass" in logger.name
 
-    def test_logging_rotation(self):
+    def test_logging_rotation(self, tmp_path):
         """Test that file handler uses rotation."""
-        with TemporaryDirectory() as tmpdir:
-            log_file = os.path.join(tmpdir, "test.log")
-            logger = setup_logging(
-                log_level="INFO",
-                log_file=log_file,
-                max_bytes=1024,
-                backup_count=3
-            )
+        logger = setup_logging(
+            log_level="INFO",
+            log_file=str(tmp_path / "test.log"),
+            max_bytes=1024,
+            backup_count=3
+        )
 
-            # Find the RotatingFileHandler
-            from logging.handlers import RotatingFileHandler
-            file_handlers = [h for h in logger.handlers if isinstance(h, RotatingFileHandler)]
-            assert len(file_handlers) == 1
+        # Find the RotatingFileHandler
+        from logging.handlers import RotatingFileHandler
+        file_handlers = [h for h in logger.handlers if isinstance(h, RotatingFileHandler)]
+        assert len(file_handlers) == 1
 
-            handler = file_handlers[0]
-            assert handler.maxBytes == 1024
-            assert handler.backupCount == 3
+        handler = file_handlers[0]
+        assert handler.maxBytes == 1024
+        assert handler.backupCount == 3
 
 
 class TestIntegration:
@@ -417,15 +383,10 @@ class TestIntegration:
         )
 
         # Verify types
-        assert isinstance(Settings, type)
-        assert callable(get_settings)
-        assert callable(reload_settings)
-        assert isinstance(ArticleStatus, type)
-        assert isinstance(ContentType, type)
-        assert isinstance(LLMProvider, type)
-        assert callable(setup_logging)
-        assert callable(get_logger)
-        assert isinstance(LoggerMixin, type)
+        for cls in (Settings, ArticleStatus, ContentType, LLMProvider, LoggerMixin):
+            assert isinstance(cls, type), cls
+        for func in (get_settings, reload_settings, setup_logging, get_logger):
+            assert callable(func), func
 
     def test_settings_with_logging(self, monkeypatch):
         """Test using settings with logging."""
@@ -13,70 +13,66 @@ Note: These tests mock the QueryOptimizer to avoid importing Azure OpenAI depend
 
 import pytest
 import json
+import re
 from unittest.mock import Mock, MagicMock, patch
-from dataclasses import asdict
-
-# Mock the Azure OpenAI import before importing the module
-import sys
-sys.modules['openai'] = Mock()
 
 from src.intent.news_agent import NewsAgent
 from src.api_client.models import UserQuery
 
+_UNKNOWN_TOOL = re.compile("Unknown tool")
+_API_ERROR = re.compile("API Error")
+
 
 class TestNewsAgentInit:
     """Test NewsAgent initialization."""
 
-    def test_init_with_clients(self):
-        """Test NewsAgent initializes correctly with clients."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
+    def test_init_with_clients(self, mock_anthropic, mock_news_client, agent):
+        """Test NewsAgent initializes correctly with clients and the shared tool definitions."""
         assert agent.client == mock_anthropic
         assert agent.news_client == mock_news_client
         assert agent.conversation_history == {}
-        assert len(agent.tools) == 4
-
-    def test_tools_definition(self):
-        """Test that all required tools are defined."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
-        tool_names = [tool["name"] for tool in agent.tools]
-        assert "optimize_queries" in tool_names
-        assert "search_everything" in tool_names
-        assert "search_top_headlines" in tool_names
-        assert "get_sources" in tool_names
-
-    def test_tool_schemas_valid(self):
-        """Test that all tool schemas are valid."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
-        agent = NewsAgent(mock_anthropic, mock_news_client)
+        assert agent.tools is NewsAgent(Mock(), Mock()).tools
 
+        assert [tool["name"] for tool in agent.tools] == [
+            "optimize_queries", "search_everything", "search_top_headlines", "get_sources"
+        ]
         for tool in agent.tools:
-            assert "name" in tool
             assert "description" in tool
-            assert "input_schema" in tool
             assert tool["input_schema"]["type"] == "object"
             assert "properties" in tool["input_schema"]
 
 
+# NewsAPI-backed tools: (tool name, tool input, stubbed client response, result list key, expected list length)
+NEWS_TOOL_CASES = [
+    (
+        "search_everything",
+        {"q": "climate change", "languages": ["en"]},
+        {"status": "ok", "totalResults": 100, "articles": [{"title": f"Article {i}"} for i in range(15)]},
+        "articles",
+        10,  # Limited to 10
+    ),
+    (
+        "search_top_headlines",
+        {"countries": ["us"], "categories": ["technology"]},
+        {"status": "ok", "totalResults": 20, "articles": [{"title": f"Headline {i}"} for i in range(20)]},
+        "articles",
+        10,  # Limited to 10
+    ),
+    (
+        "get_sources",
+        {"categories": ["general"], "languages": ["en"]},
+        {"status": "ok", "sources": [{"id": "bbc-news", "name": "BBC News"}, {"id": "cnn", "name": "CNN"}]},
+        "sources",
+        2,
+    ),
+]
+
+
 class TestToolExecution:
     """Test individual tool execution."""
 
-    def test_execute_optimize_queries(self):
+    def test_execute_optimize_queries(self, agent):
         """Test optimize_queries tool execution."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
         # Mock QueryOptimizer
         with patch('src.intent.news_agent.QueryOptimizer') as MockOptimizer:
             mock_optimizer = Mock()
@@ -91,101 +87,74 @@ class TestToolExecution:
             assert isinstance(result["queries"], list)
             mock_optimizer.optimize_query.assert_called_once_with("latest news about AI")
 
-    def test_execute_search_everything(self):
-        """Test search_everything tool execution."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
-        # Mock the search response
-        mock_news_client.search_everything.return_value = {
-            "status": "ok",
-            "totalResults": 100,
-            "articles": [{"title": f"Article {i}"} for i in range(15)]
-        }
-
-        agent = NewsAgent(mock_anthropic, mock_news_client)
+    @pytest.mark.parametrize("tool_name,tool_input,stubbed_response,list_key,expected_length", NEWS_TOOL_CASES)
+    def test_execute_news_tool(self, mock_news_client, agent, tool_name, tool_input,
+                               stubbed_response, list_key, expected_length):
+        """Test each NewsAPI tool calls its client method once and trims the result."""
+        client_method = getattr(mock_news_client, tool_name)
+        client_method.return_value = stubbed_response
 
-        tool_input = {"q": "climate change", "languages": ["en"]}
-        result = agent._execute_tool("search_everything", tool_input)
+        result = agent._execute_tool(tool_name, tool_input)
 
         assert result["status"] == "ok"
-        assert result["total_results"] == 100
-        assert len(result["articles"]) == 10  # Limited to 10
-        mock_news_client.search_everything.assert_called_once()
-
-    def test_execute_search_top_headlines(self):
-        """Test search_top_headlines tool execution."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
+        assert result.get("total_results") == stubbed_response.get("totalResults")
+        assert len(result[list_key]) == expected_length
+        client_method.assert_called_once()
 
-        # Mock the headlines response
-        mock_news_client.search_top_headlines.return_value = {
+    def test_search_results_omit_article_content(self, mock_news_client, agent):
+        """Test article content snippets are not sent back to Claude."""
+        mock_news_client.search_everything.return_value = {
             "status": "ok",
-            "totalResults": 20,
-            "articles": [{"title": f"Headline {i}"} for i in range(20)]
+            "totalResults": 1,
+            "articles": [{
+                "title": "Article",
+                "url": "https://example.com/a",
+                "source": {"id": None, "name": "Example"},
+                "content": "Long body text... [+4000 chars]"
+            }]
         }
 
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
-        tool_input = {"countries": ["us"], "categories": ["technology"]}
-        result = agent._execute_tool("search_top_headlines", tool_input)
-
-        assert result["status"] == "ok"
-        assert result["total_results"] == 20
-        assert len(result["articles"]) == 10  # Limited to 10
-        mock_news_client.search_top_headlines.assert_called_once()
+        result = agent._execute_tool("search_everything", {"q": "climate"})
 
-    def test_execute_get_sources(self):
-        """Test get_sources tool execution."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
+        assert result["articles"] == [{
+            "title": "Article",
+            "url": "https://example.com/a",
+            "source": {"id": None, "name": "Example"}
+        }]
 
-        # Mock the sources response
-        mock_news_client.get_sources.return_value = {
+    def test_repeated_tool_call_reuses_result(self, mock_news_client, agent):
+        """Test identical tool calls are served from the tool result cache."""
+        mock_news_client.search_top_headlines.return_value = {
             "status": "ok",
-            "sources": [
-                {"id": "bbc-news", "name": "BBC News"},
-                {"id": "cnn", "name": "CNN"}
-            ]
+            "totalResults": 1,
+            "articles": [{"title": "Headline"}]
         }
 
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
-        tool_input = {"categories": ["general"], "languages": ["en"]}
-        result = agent._execute_tool("get_sources", tool_input)
+        first = agent._tool_result_content("search_top_headlines", {"countries": ["us"], "categories": ["business"]})
+        second = agent._tool_result_content("search_top_headlines", {"categories": ["business"], "countries": ["us"]})
+        agent._tool_result_content("search_top_headlines", {"countries": ["us"]}, cacheable=False)
 
-        assert result["status"] == "ok"
-        assert len(result["sources"]) == 2
-        mock_news_client.get_sources.assert_called_once()
+        assert first == second
+        assert json.loads(first)["articles"] == [{"title": "Headline"}]
+        assert mock_news_client.search_top_headlines.call_count == 2
 
-    def test_execute_unknown_tool(self):
+    def test_execute_unknown_tool(self, agent):
         """Test that unknown tool raises ValueError."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
-        with pytest.raises(ValueError, match="Unknown tool"):
+        with pytest.raises(ValueError, match=_UNKNOWN_TOOL):
             agent._execute_tool("invalid_tool", {})
 
 
 class TestProcessRequest:
     """Test request processing and conversation flow."""
 
-    def test_process_request_simple_response(self):
+    def test_process_request_simple_response(self, mock_anthropic, mock_news_client):
         """Test processing a simple request that doesn't require tools."""
-        from conftest import create_text_block
-
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
+        from conftest import text_response, queue_responses
 
         # Mock a simple text response (no tool use)
-        mock_response = Mock()
-        mock_response.stop_reason = "end_turn"
-        mock_text_block = create_text_block("Here is the news you requested.")
-        mock_response.content = [mock_text_block]
+        mock_response = text_response("Here is the news you requested.")
 
-        mock_anthropic.messages.create.return_value = mock_response
+        queue_responses(mock_anthropic, mock_response)
 
         agent = NewsAgent(mock_anthropic, mock_news_client)
 
@@ -196,18 +165,12 @@ class TestProcessRequest:
         assert "messages" in result
         mock_anthropic.messages.create.assert_called_once()
 
-    def test_process_request_with_tool_use(self):
+    def test_process_request_with_tool_use(self, mock_anthropic, mock_news_client):
         """Test processing a request that uses tools."""
-        from conftest import create_text_block, create_tool_block
-
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
+        from conftest import text_response, tool_use_response, queue_responses
 
         # Mock tool use response, then final response
-        mock_tool_response = Mock()
-        mock_tool_response.stop_reason = "tool_use"
-        mock_tool_block = create_tool_block("search_everything", {"q": "AI", "languages": ["en"]})
-        mock_tool_response.content = [mock_tool_block]
+        mock_tool_response = tool_use_response("search_everything", {"q": "AI", "languages": ["en"]})
 
         # Mock news client response
         mock_news_client.search_everything.return_value = {
@@ -217,16 +180,10 @@ class TestProcessRequest:
         }
 
         # Mock final text response
-        mock_final_response = Mock()
-        mock_final_response.stop_reason = "end_turn"
-        mock_text_block = create_text_block("I found 5 articles about AI.")
-        mock_final_response.content = [mock_text_block]
+        mock_final_response = text_response("I found 5 articles about AI.")
 
         # Set up the mock to return tool response first, then final response
-        mock_anthropic.messages.create.side_effect = [
-            mock_tool_response,
-            mock_final_response
-        ]
+        queue_responses(mock_anthropic, mock_tool_response, mock_final_response)
 
         agent = NewsAgent(mock_anthropic, mock_news_client)
 
@@ -236,161 +193,462 @@ class TestProcessRequest:
         assert "I found 5 articles about AI" in result["response"]
         assert mock_anthropic.messages.create.call_count == 2
 
-    def test_process_request_with_session_id(self):
-        """Test that session_id maintains conversation history."""
-        from conftest import create_text_block
+    def test_tool_results_marked_for_prompt_caching(self, mock_anthropic, mock_news_client):
+        """Test the latest tool results carry a cache breakpoint that is not stored in history."""
+        from conftest import text_response, tool_use_response, queue_responses
+
+        mock_news_client.search_everything.return_value = {"status": "ok", "totalResults": 0, "articles": []}
+
+        mock_tool_response = tool_use_response("search_everything", {"q": "AI"})
+        mock_final_response = text_response("Done.")
+        queue_responses(mock_anthropic, mock_tool_response, mock_final_response)
+
+        agent = NewsAgent(mock_anthropic, mock_news_client)
+        result = agent.process_request("Find news about AI")
+
+        first_call, second_call = mock_anthropic.messages.create.call_args_list
+        assert first_call.kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        sent_results = second_call.kwargs["messages"][-1]["content"]
+        assert sent_results[-1]["cache_control"] == {"type": "ephemeral"}
+        stored_results = result["messages"][2]["content"]
+        assert "cache_control" not in stored_results[-1]
+
+    def test_tool_calls_in_one_response_run_concurrently(self, mock_anthropic, mock_news_client):
+        """Test several tool_use blocks from one response execute at the same time."""
+        import threading
+        from conftest import create_tool_block, text_response, queue_responses
+
+        both_running = threading.Barrier(2, timeout=5)
+
+        def search(query):
+            both_running.wait()  # Raises BrokenBarrierError if calls are sequential
+            return {"status": "ok", "totalResults": 0, "articles": []}
+
+        mock_news_client.search_everything.side_effect = search
+
+        mock_tool_response = Mock()
+        mock_tool_response.stop_reason = "tool_use"
+        mock_tool_response.content = [
+            create_tool_block("search_everything", {"q": "AI"}, tool_id="tool_1"),
+            create_tool_block("search_everything", {"q": "ML"}, tool_id="tool_2"),
+        ]
+        mock_final_response = text_response("Done.")
+        queue_responses(mock_anthropic, mock_tool_response, mock_final_response)
+
+        agent = NewsAgent(mock_anthropic, mock_news_client)
+        result = agent.process_request("AI and ML news")
+
+        assert [r["tool_use_id"] for r in result["messages"][2]["content"]] == ["tool_1", "tool_2"]
+        assert mock_news_client.search_everything.call_count == 2
+
+    def test_tool_calls_of_concurrent_requests_not_throttled(self, mock_anthropic, mock_news_client):
+        """Test concurrent requests get their own tool workers rather than sharing a fixed pool."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from conftest import create_tool_block, text_response
+        from src.config.constants import TOOL_EXECUTION_WORKERS
+
+        requests, calls_per_request = 3, 2
+        assert requests * calls_per_request > TOOL_EXECUTION_WORKERS
+        all_running = threading.Barrier(requests * calls_per_request, timeout=5)
+
+        def search(query):
+            all_running.wait()  # Raises BrokenBarrierError if calls queue behind each other
+            return {"status": "ok", "totalResults": 0, "articles": []}
+
+        mock_news_client.search_everything.side_effect = search
+
+        def create(**kwargs):
+            if isinstance(kwargs["messages"][-1]["content"], list):  # tool results are in
+                return text_response("Done.")
+            response = Mock()
+            response.stop_reason = "tool_use"
+            response.content = [
+                create_tool_block("search_everything", {"q": f"{kwargs['messages'][-1]['content']} {i}"}, tool_id=f"tool_{i}")
+                for i in range(calls_per_request)
+            ]
+            return response
+
+        mock_anthropic.messages.create.side_effect = create
+
+        agent = NewsAgent(mock_anthropic, mock_news_client)
+        with ThreadPoolExecutor(max_workers=requests) as pool:
+            results = list(pool.map(agent.process_request, [f"topic {n}" for n in range(requests)]))
+
+        assert all(result["response"] == "Done." for result in results)
+        assert mock_news_client.search_everything.call_count == requests * calls_per_request
+
+    def test_aprocess_request_with_async_client(self):
+        """Test the awaitable agent loop runs tool calls concurrently with an async client."""
+        import asyncio
+        import threading
+        from unittest.mock import AsyncMock
+        from conftest import create_tool_block, text_response
 
         mock_anthropic = Mock()
         mock_news_client = Mock()
+        both_running = threading.Barrier(2, timeout=5)
 
-        # Mock simple response
-        mock_response = Mock()
-        mock_response.stop_reason = "end_turn"
-        mock_text_block = create_text_block("Response")
-        mock_response.content = [mock_text_block]
+        def search(query):
+            both_running.wait()
+            return {"status": "ok", "totalResults": 0, "articles": []}
 
-        mock_anthropic.messages.create.return_value = mock_response
+        mock_news_client.search_everything.side_effect = search
+
+        mock_tool_response = Mock()
+        mock_tool_response.stop_reason = "tool_use"
+        mock_tool_response.content = [
+            create_tool_block("search_everything", {"q": "AI"}, tool_id="tool_1"),
+            create_tool_block("search_everything", {"q": "ML"}, tool_id="tool_2"),
+        ]
+        mock_final_response = text_response("Done.")
+        mock_anthropic.messages.create = AsyncMock(side_effect=[mock_tool_response, mock_final_response])
 
         agent = NewsAgent(mock_anthropic, mock_news_client)
+        result = asyncio.run(agent.aprocess_request("AI and ML news", session_id="s"))
+
+        assert result["response"] == "Done."
+        assert [r["tool_use_id"] for r in result["messages"][2]["content"]] == ["tool_1", "tool_2"]
+        assert len(agent.conversation_history["s"]) == 4
+
+    def test_aprocess_request_keeps_blocking_calls_off_event_loop(self):
+        """Test session store and semantic cache calls run outside the event loop thread."""
+        import asyncio
+        import threading
+        from unittest.mock import AsyncMock
+        from conftest import text_response
 
-        # First request with session
-        result1 = agent.process_request("First message", session_id="session_123")
+        callers = set()
 
-        # Verify conversation history is stored
-        assert "session_123" not in agent.conversation_history or \
-               len(result1["messages"]) >= 1
+        class RecordingStore(dict):
+            def get(self, key, default=None):
+                callers.add(threading.get_ident())
+                return super().get(key, default)
 
-    def test_process_request_without_session_id(self):
-        """Test that requests without session_id don't maintain history."""
-        from conftest import create_text_block
+            def __setitem__(self, key, value):
+                callers.add(threading.get_ident())
+                super().__setitem__(key, value)
 
+        semantic_cache = Mock()
+        semantic_cache.get.side_effect = lambda prompt: callers.add(threading.get_ident())
         mock_anthropic = Mock()
-        mock_news_client = Mock()
+        mock_anthropic.messages.create = AsyncMock(side_effect=[text_response("First"), text_response("Second")])
+
+        agent = NewsAgent(mock_anthropic, Mock(), session_store=RecordingStore(), semantic_cache=semantic_cache)
+
+        async def run():
+            await agent.aprocess_request("latest EV news")
+            await agent.aprocess_request("and in Europe?", session_id="s")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        assert semantic_cache.get.called and semantic_cache.put.called
+        assert callers and loop_thread not in callers
+        assert len(agent.conversation_history["s"]) == 2
+
+    def test_streamed_tool_calls_executed_in_order(self, mock_anthropic, mock_news_client):
+        """Test streamed tool_use blocks are executed and results keep block order."""
+        from types import SimpleNamespace
+        from conftest import create_text_block, create_tool_block
+
+        mock_news_client.search_everything.return_value = {"status": "ok", "totalResults": 0, "articles": []}
+        mock_news_client.search_top_headlines.return_value = {"status": "ok", "totalResults": 0, "articles": []}
+
+        blocks = [
+            create_tool_block("search_everything", {"q": "AI"}, tool_id="tool_1"),
+            create_tool_block("search_top_headlines", {"countries": ["us"]}, tool_id="tool_2"),
+        ]
+
+        def events():
+            for block in blocks:
+                yield SimpleNamespace(type="content_block_stop", content_block=block)
+
+        stream = MagicMock()
+        stream.__enter__.return_value.__iter__.side_effect = lambda: events()
+        stream.__enter__.return_value.get_final_message.return_value = SimpleNamespace(
+            stop_reason="tool_use", content=blocks
+        )
+        done = MagicMock()
+        done.__enter__.return_value.__iter__.side_effect = lambda: iter(())
+        done.__enter__.return_value.get_final_message.return_value = SimpleNamespace(
+            stop_reason="end_turn", content=[create_text_block("Done.")]
+        )
+        mock_anthropic.messages.stream.side_effect = [stream, done]
+
+        agent = NewsAgent(mock_anthropic, mock_news_client, stream_responses=True)
+        result = agent.process_request("AI news")
+
+        mock_anthropic.messages.create.assert_not_called()
+        assert result["response"] == "Done."
+        assert [r["tool_use_id"] for r in result["messages"][2]["content"]] == ["tool_1", "tool_2"]
+        mock_news_client.search_top_headlines.assert_called_once()
+
+    @pytest.mark.parametrize("session_id", [None, "session_123"])
+    def test_process_request_session_history(self, mock_anthropic, agent, session_id):
+        """Test that only requests with a session_id keep conversation history."""
+        from conftest import text_response, queue_responses
+
+        queue_responses(mock_anthropic, text_response("Response"))
+
+        result = agent.process_request("First message", session_id=session_id)
+
+        assert [m["role"] for m in result["messages"]] == ["user", "assistant"]
+        if session_id:
+            assert agent.conversation_history[session_id] == result["messages"]
+        else:
+            assert agent.conversation_history == {}
+
+    def test_overlapping_turns_of_one_session_stay_separate(self, mock_anthropic, mock_news_client):
+        """Test two requests for the same session running at once don't interleave their histories."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from conftest import create_tool_block, text_response
+
+        both_running = threading.Barrier(2, timeout=5)
+
+        def search(query):
+            both_running.wait()  # Both turns are mid-flight here
+            return {"status": "ok", "totalResults": 0, "articles": []}
+
+        mock_news_client.search_everything.side_effect = search
+
+        def create(**kwargs):
+            last = kwargs["messages"][-1]
+            if isinstance(last["content"], list):  # tool results are in
+                return text_response("Done.")
+            response = Mock()
+            response.stop_reason = "tool_use"
+            response.content = [create_tool_block("search_everything", {"q": last["content"]}, tool_id=last["content"])]
+            return response
+
+        mock_anthropic.messages.create.side_effect = create
+
+        agent = NewsAgent(mock_anthropic, mock_news_client)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(lambda prompt: agent.process_request(prompt, session_id="s"), ["AI", "ML"]))
+
+        for prompt, result in zip(["AI", "ML"], results):
+            assert [m["role"] for m in result["messages"]] == ["user", "assistant", "user", "assistant"]
+            assert result["messages"][2]["content"][0]["tool_use_id"] == prompt
+        assert agent.conversation_history["s"] in [result["messages"] for result in results]
+
+    def test_session_store_evicts_oldest_session(self, mock_anthropic):
+        """Test that a bounded session store drops the least recently used session."""
+        from cachetools import LRUCache
+        from conftest import text_response, queue_responses
+
+        mock_response = text_response("Response")
+        queue_responses(mock_anthropic, mock_response)
+
+        agent = NewsAgent(mock_anthropic, Mock(), session_store=LRUCache(maxsize=2))
+
+        agent.process_request("First", session_id="a")
+        agent.process_request("Second", session_id="b")
+        agent.process_request("Again", session_id="a")
+        agent.process_request("Third", session_id="c")
+
+        assert set(agent.conversation_history) == {"a", "c"}
+        assert len(agent.conversation_history["a"]) == 4
+
+    def test_redis_session_store_shares_history_between_agents(self, mock_anthropic):
+        """Test sessions stored in Redis continue on another agent (worker)."""
+        from anthropic.types import TextBlock
+        from src.intent.session_store import RedisSessionStore
+        from conftest import queue_responses
+
+        class FakeRedis:
+            def __init__(self):
+                self.data, self.ttls = {}, {}
+
+            def get(self, key):
+                return self.data.get(key)
+
+            def setex(self, key, ttl, value):
+                self.data[key], self.ttls[key] = value, ttl
 
-        # Mock simple response
         mock_response = Mock()
         mock_response.stop_reason = "end_turn"
-        mock_text_block = create_text_block("Response")
-        mock_response.content = [mock_text_block]
+        mock_response.content = [TextBlock(type="text", text="Response")]
+        queue_responses(mock_anthropic, mock_response)
+
+        redis_client = FakeRedis()
+        first_worker = NewsAgent(mock_anthropic, Mock(), session_store=RedisSessionStore(redis_client, ttl=60))
+        second_worker = NewsAgent(mock_anthropic, Mock(), session_store=RedisSessionStore(redis_client, ttl=60))
+
+        first_worker.process_request("First", session_id="a")
+        result = second_worker.process_request("Second", session_id="a")
+
+        assert redis_client.ttls == {"conv:a": 60}
+        assert [m["role"] for m in result["messages"]] == ["user", "assistant", "user", "assistant"]
+        assert result["messages"][1]["content"] == [{"type": "text", "text": "Response"}]
+        assert len(second_worker.conversation_history["a"]) == 4
+
+    def test_trim_history_drops_whole_oldest_turns(self):
+        """Test session history is trimmed by whole turns, keeping tool pairs intact."""
+        from types import SimpleNamespace
+        from src.intent.news_agent import _trim_history
+
+        def turn(prompt, payload_chars):
+            return [
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": [SimpleNamespace(type="tool_use", input={"q": prompt})]},
+                {"role": "user", "content": [{"type": "tool_result", "content": "x" * payload_chars}]},
+                {"role": "assistant", "content": [SimpleNamespace(type="text", text="done")]},
+            ]
 
-        mock_anthropic.messages.create.return_value = mock_response
+        messages = turn("first", 4000) + turn("second", 4000) + turn("third", 400)
+        _trim_history(messages, max_tokens=1200)
 
-        agent = NewsAgent(mock_anthropic, mock_news_client)
+        assert [m["content"] for m in messages if isinstance(m["content"], str)] == ["second", "third"]
+        assert len(messages) == 8
 
-        result = agent.process_request("Message without session")
+        _trim_history(messages, max_tokens=1)
+        assert messages[0]["content"] == "third"
+        assert len(messages) == 4
 
-        # Verify messages are returned but not stored
-        assert "messages" in result
-        assert len(result["messages"]) >= 1
+    def test_estimate_tokens_counts_serialized_assistant_blocks(self):
+        """Test assistant blocks loaded back from a session store as dicts are still counted."""
+        from types import SimpleNamespace
+        from src.intent.news_agent import _estimate_tokens
 
+        tool_use = SimpleNamespace(type="tool_use", input={"q": "x" * 400})
+        text = SimpleNamespace(type="text", text="y" * 400)
+        sdk_message = {"role": "assistant", "content": [tool_use, text]}
+        stored_message = {"role": "assistant", "content": [
+            {"type": "tool_use", "input": tool_use.input},
+            {"type": "text", "text": text.text},
+        ]}
 
-class TestToolDefinitions:
-    """Test tool definition details."""
+        assert _estimate_tokens(stored_message) == _estimate_tokens(sdk_message) > 200
+
+    def test_semantic_cache_answers_stateless_requests(self, mock_anthropic):
+        """Test a cached answer skips Claude for stateless requests only."""
+        from conftest import text_response, queue_responses
 
-    def test_optimize_queries_tool_schema(self):
-        """Test optimize_queries tool has correct schema."""
-        agent = NewsAgent(Mock(), Mock())
+        queue_responses(mock_anthropic, text_response("EV news"), text_response("EV news in Europe"))
 
-        tool = next(t for t in agent.tools if t["name"] == "optimize_queries")
+        semantic_cache = Mock()
+        semantic_cache.get.return_value = None
+        agent = NewsAgent(mock_anthropic, Mock(), semantic_cache=semantic_cache)
 
-        assert "user_input" in tool["input_schema"]["properties"]
-        assert "user_input" in tool["input_schema"]["required"]
+        first = agent.process_request("latest EV news")
+        cached = semantic_cache.put.call_args.args[1]
+        assert cached["response"] == "EV news"
 
-    def test_search_everything_tool_schema(self):
-        """Test search_everything tool has correct schema."""
-        agent = NewsAgent(Mock(), Mock())
+        semantic_cache.get.return_value = cached
+        second = agent.process_request("recent electric vehicle news")
 
-        tool = next(t for t in agent.tools if t["name"] == "search_everything")
+        assert mock_anthropic.messages.create.call_count == 1
+        assert second["response"] == first["response"]
+        assert second["messages"][0]["content"] == "recent electric vehicle news"
+        assert len(second["messages"]) == len(first["messages"])
+
+        # Requests within a session neither read nor feed the cache
+        agent.process_request("and in Europe?", session_id="b")
+        assert semantic_cache.get.call_count == 2
+        assert semantic_cache.put.call_count == 1
+        assert mock_anthropic.messages.create.call_count == 2
 
-        props = tool["input_schema"]["properties"]
-        assert "q" in props
-        assert "searchIn" in props
-        assert "sources" in props
-        assert "domains" in props
-        assert "from_date" in props
-        assert "to_date" in props
-        assert "languages" in props
-        assert "sortBy" in props
-        assert "max_results" in props
-        assert "q" in tool["input_schema"]["required"]
+@pytest.fixture(scope="module")
+def tools_by_name():
+    """Tool definitions of one agent, keyed by tool name."""
+    agent = NewsAgent(Mock(), Mock())
+    return {tool["name"]: tool for tool in agent.tools}
 
-    def test_search_top_headlines_tool_schema(self):
-        """Test search_top_headlines tool has correct schema."""
-        agent = NewsAgent(Mock(), Mock())
 
-        tool = next(t for t in agent.tools if t["name"] == "search_top_headlines")
+# Snapshot of the tool schemas: tool name -> (defined properties, required properties)
+EXPECTED_TOOL_SCHEMAS = {
+    "optimize_queries": (frozenset({"user_input"}), frozenset({"user_input"})),
+    "search_everything": (
+        frozenset({"q", "searchIn", "sources", "domains", "excludeDomains", "from_date", "to_date",
+                   "languages", "sortBy", "max_results"}),
+        frozenset({"q"}),
+    ),
+    "search_top_headlines": (frozenset({"q", "countries", "categories", "sources", "max_results"}), frozenset()),
+    "get_sources": (frozenset({"categories", "languages", "countries"}), frozenset()),
+}
 
-        props = tool["input_schema"]["properties"]
-        assert "q" in props
-        assert "countries" in props
-        assert "categories" in props
-        assert "sources" in props
-        assert "max_results" in props
 
-    def test_get_sources_tool_schema(self):
-        """Test get_sources tool has correct schema."""
-        agent = NewsAgent(Mock(), Mock())
+class TestToolDefinitions:
+    """Test tool definition details."""
 
-        tool = next(t for t in agent.tools if t["name"] == "get_sources")
+    def test_tool_schemas(self, tools_by_name):
+        """Test the tools define and require exactly the snapshotted input properties."""
+        schemas = {
+            name: (frozenset(tool["input_schema"]["properties"]), frozenset(tool["input_schema"].get("required", ())))
+            for name, tool in tools_by_name.items()
+        }
 
-        props = tool["input_schema"]["properties"]
-        assert "categories" in props
-        assert "languages" in props
-        assert "countries" in props
+        assert schemas == EXPECTED_TOOL_SCHEMAS
 
 
 class TestErrorHandling:
     """Test error handling in NewsAgent."""
 
-    def test_search_everything_with_invalid_input(self):
+    def test_search_everything_with_invalid_input(self, mock_anthropic):
         """Test that invalid input to search_everything is handled."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
+        agent = NewsAgent(mock_anthropic, Mock())
         # Missing required 'q' parameter should raise error
         tool_input = {"languages": ["en"]}
 
         with pytest.raises(Exception):  # Could be TypeError or ValidationError
             agent._execute_tool("search_everything", tool_input)
 
-    def test_news_client_error_propagates(self):
+    def test_news_client_error_propagates(self, mock_news_client, agent):
         """Test that news client errors propagate correctly."""
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
-
         # Mock client to raise error
         mock_news_client.search_everything.side_effect = Exception("API Error")
 
-        agent = NewsAgent(mock_anthropic, mock_news_client)
-
         tool_input = {"q": "test"}
 
-        with pytest.raises(Exception, match="API Error"):
+        with pytest.raises(Exception, match=_API_ERROR):
             agent._execute_tool("search_everything", tool_input)
 
 
+class TestParseToolResult:
+    """Test tool_result payload decoding."""
+
+    def test_parse_json_string(self):
+        """Test that JSON string payloads are decoded."""
+        from src.intent.news_agent import parse_tool_result
+
+        payload = json.dumps({"status": "ok", "articles": [{"title": "A"}]})
+        result = parse_tool_result(payload)
+
+        assert result["articles"][0]["title"] == "A"
+
+    def test_parse_is_memoized(self):
+        """Test that the same payload is only parsed once."""
+        from src.intent.news_agent import parse_tool_result
+
+        payload = json.dumps({"status": "ok", "articles": []})
+
+        assert parse_tool_result(payload) is parse_tool_result(payload)
+
+    def test_parse_passes_through_decoded_content(self):
+        """Test that already-decoded content is returned unchanged."""
+        from src.intent.news_agent import parse_tool_result
+
+        content = {"articles": []}
+
+        assert parse_tool_result(content) is content
+
+
 class TestIntegration:
     """Integration tests for NewsAgent."""
 
-    def test_full_workflow_with_mocks(self):
+    def test_full_workflow_with_mocks(self, mock_anthropic, mock_news_client):
         """Test a complete workflow with all mocked components."""
-        from conftest import create_text_block, create_tool_block
-
-        mock_anthropic = Mock()
-        mock_news_client = Mock()
+        from conftest import text_response, tool_use_response, queue_responses
 
         # Set up mock responses
         # 1. Tool use response
-        mock_tool_response = Mock()
-        mock_tool_response.stop_reason = "tool_use"
-        mock_tool_block = create_tool_block(
+        mock_tool_response = tool_use_response(
             "search_everything",
             {"q": "technology", "languages": ["en"]},
             "tool_abc"
         )
-        mock_tool_response.content = [mock_tool_block]
 
         # 2. News API response
         mock_news_client.search_everything.return_value = {
@@ -404,15 +662,9 @@ class TestIntegration:
         }
 
         # 3. Final response
-        mock_final_response = Mock()
-        mock_final_response.stop_reason = "end_turn"
-        mock_text_block = create_text_block("I found 3 technology articles for you.")
-        mock_final_response.content = [mock_text_block]
-
-        mock_anthropic.messages.create.side_effect = [
-            mock_tool_response,
-            mock_final_response
-        ]
+        mock_final_response = text_response("I found 3 technology articles for you.")
+
+        queue_responses(mock_anthropic, mock_tool_response, mock_final_response)
 
         agent = NewsAgent(mock_anthropic, mock_news_client)
 
@@ -425,7 +677,5 @@ class TestIntegration:
 
     def test_agent_can_be_imported(self):
         """Test that NewsAgent can be imported from the module."""
-        from src.intent.news_agent import NewsAgent
-
         assert NewsAgent is not None
         assert callable(NewsAgent)